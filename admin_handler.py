@@ -2,349 +2,676 @@
 Admin Handler Module
 Manages admin-only features and settings editing
 """
-from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-from telegram.ext import ContextTypes, ConversationHandler
-from typing import Optional
-from settings import config
+from telegram import CallbackQuery, Message, Update, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+from telegram.error import BadRequest
+from telegram.ext import Application, ContextTypes, ConversationHandler
+from typing import Any, Dict, Optional, Tuple
+from enum import IntEnum
+from html import escape
+from settings import config, ADMIN_STATE_TTL, ADMIN_STATE_SWEEP_INTERVAL, RESERVED_MENUS
+import asyncio
+import functools
 import logging
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
-# Conversation states
-WAITING_WELCOME_MSG, WAITING_RESPONSE_BUTTON, WAITING_RESPONSE_TEXT = range(3)
-WAITING_ADMIN_ID = 4
-WAITING_MENU_SELECT, WAITING_MENU_ACTION, WAITING_NEW_TITLE, WAITING_BUTTON_ACTION = range(5, 9)
-WAITING_BUTTON_SELECT, WAITING_NEW_BUTTON_TEXT = range(9, 11)
-WAITING_NEW_MENU_NAME, WAITING_NEW_MENU_TITLE, WAITING_DELETE_MENU_CONFIRM = range(11, 14)
-WAITING_NEW_BUTTON_NAME = 14
-WAITING_ADD_TO_MAIN, WAITING_MAIN_BUTTON_TEXT = range(15, 17)
-WAITING_MAPPING_BUTTON, WAITING_MAPPING_TARGET = range(17, 19)
+
+class State(IntEnum):
+    """Conversation states of the admin flows"""
+    WAITING_WELCOME_MSG = 0
+    WAITING_RESPONSE_BUTTON = 1
+    WAITING_RESPONSE_TEXT = 2
+    WAITING_ADMIN_ID = 4
+    WAITING_MENU_SELECT = 5
+    WAITING_MENU_ACTION = 6
+    WAITING_NEW_TITLE = 7
+    WAITING_BUTTON_ACTION = 8
+    WAITING_BUTTON_SELECT = 9
+    WAITING_NEW_BUTTON_TEXT = 10
+    WAITING_NEW_MENU_NAME = 11
+    WAITING_NEW_MENU_TITLE = 12
+    WAITING_DELETE_MENU_CONFIRM = 13
+    WAITING_NEW_BUTTON_NAME = 14
+    WAITING_ADD_TO_MAIN = 15
+    WAITING_MAIN_BUTTON_TEXT = 16
+    WAITING_MAPPING_BUTTON = 17
+    WAITING_MAPPING_TARGET = 18
+
+
+# Module-level aliases, as imported by bot.py
+WAITING_WELCOME_MSG = State.WAITING_WELCOME_MSG
+WAITING_RESPONSE_BUTTON = State.WAITING_RESPONSE_BUTTON
+WAITING_RESPONSE_TEXT = State.WAITING_RESPONSE_TEXT
+WAITING_ADMIN_ID = State.WAITING_ADMIN_ID
+WAITING_MENU_SELECT = State.WAITING_MENU_SELECT
+WAITING_MENU_ACTION = State.WAITING_MENU_ACTION
+WAITING_NEW_TITLE = State.WAITING_NEW_TITLE
+WAITING_BUTTON_ACTION = State.WAITING_BUTTON_ACTION
+WAITING_BUTTON_SELECT = State.WAITING_BUTTON_SELECT
+WAITING_NEW_BUTTON_TEXT = State.WAITING_NEW_BUTTON_TEXT
+WAITING_NEW_MENU_NAME = State.WAITING_NEW_MENU_NAME
+WAITING_NEW_MENU_TITLE = State.WAITING_NEW_MENU_TITLE
+WAITING_DELETE_MENU_CONFIRM = State.WAITING_DELETE_MENU_CONFIRM
+WAITING_NEW_BUTTON_NAME = State.WAITING_NEW_BUTTON_NAME
+WAITING_ADD_TO_MAIN = State.WAITING_ADD_TO_MAIN
+WAITING_MAIN_BUTTON_TEXT = State.WAITING_MAIN_BUTTON_TEXT
+WAITING_MAPPING_BUTTON = State.WAITING_MAPPING_BUTTON
+WAITING_MAPPING_TARGET = State.WAITING_MAPPING_TARGET
+
+# Static pieces of the admin panel HTML, built once at import so handlers
+# only format the dynamic fields
+_SEPARATOR = "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+_BOX_TOP = "╔═══════════════════════════════╗\n"
+_BOX_BOTTOM = "╚═══════════════════════════════╝\n\n"
+_CANCEL_HINT = f"{_SEPARATOR}\nType /cancel to abort"
+
+_SUCCESS_HEADER = f"{_BOX_TOP}║      ✅ <b>SUCCESS!</b> ✅          ║\n{_BOX_BOTTOM}"
+_ERROR_HEADER = f"{_BOX_TOP}║       ❌ <b>ERROR!</b> ❌           ║\n{_BOX_BOTTOM}"
+_WARNING_HEADER = f"{_BOX_TOP}║     ⚠️ <b>WARNING!</b> ⚠️          ║\n{_BOX_BOTTOM}"
+
+_ADMIN_PANEL_HEADER = (
+    f"{_BOX_TOP}"
+    "║    ⚙️ <b>ADMIN PANEL</b> ⚙️         ║\n"
+    f"{_BOX_BOTTOM}"
+    "📊 <b>STATUS</b>\n"
+    f"{_SEPARATOR}\n"
+    "🟢 Bot: <b>Online</b>\n"
+)
+_ADMIN_PANEL_FOOTER = (
+    "🎨 <b>CONTENT MANAGEMENT</b>\n"
+    "Use buttons below to manage\n"
+    "your bot settings."
+)
+
+_EDIT_WELCOME_HEADER = (
+    f"{_BOX_TOP}"
+    "║   📝 <b>EDIT WELCOME</b> 📝        ║\n"
+    f"{_BOX_BOTTOM}"
+    "📄 <b>CURRENT MESSAGE:</b>\n"
+    f"{_SEPARATOR}\n"
+)
+_EDIT_WELCOME_FOOTER = (
+    f"{_SEPARATOR}\n\n"
+    "✏️ <b>INSTRUCTIONS:</b>\n"
+    "Send your new welcome message\n\n"
+    "💡 <b>TIP:</b> You can use HTML:\n"
+    "• &lt;b&gt;bold&lt;/b&gt;\n"
+    "• &lt;i&gt;italic&lt;/i&gt;\n"
+    "• &lt;code&gt;monospace&lt;/code&gt;\n\n"
+    f"{_CANCEL_HINT}"
+)
+
+_EDIT_RESPONSE_HEADER = f"{_BOX_TOP}║   💬 <b>EDIT RESPONSE</b> 💬       ║\n{_BOX_BOTTOM}"
+_ADD_ADMIN_HEADER = f"{_BOX_TOP}║     ➕ <b>ADD ADMIN</b> ➕          ║\n{_BOX_BOTTOM}"
+_ADD_ADMIN_FOOTER = (
+    f"{_SEPARATOR}\n\n"
+    "✏️ <b>INSTRUCTIONS:</b>\n"
+    "Send the User ID of the\n"
+    "new admin\n\n"
+    "💡 <b>TIP:</b> Users can see their\n"
+    "   ID when they /start the bot\n\n"
+    f"{_CANCEL_HINT}"
+)
+_REMOVE_ADMIN_HEADER = f"{_BOX_TOP}║    ➖ <b>REMOVE ADMIN</b> ➖        ║\n{_BOX_BOTTOM}"
+_ADMIN_MANAGER_HEADER = f"{_BOX_TOP}║   👥 <b>ADMIN MANAGER</b> 👥       ║\n{_BOX_BOTTOM}"
+_EDIT_MENU_HEADER = f"{_BOX_TOP}║     🔧 <b>EDIT MENU</b> 🔧         ║\n{_BOX_BOTTOM}"
+
+_LAST_ADMIN_HTML = (
+    f"{_WARNING_HEADER}"
+    "❌ Cannot remove admin!\n\n"
+    "There must be at least one admin."
+)
+_SELF_REMOVE_HTML = (
+    f"{_WARNING_HEADER}"
+    "❌ You cannot remove yourself\n"
+    "   as admin!\n\n"
+    f"{_CANCEL_HINT}"
+)
+_INVALID_ID_HTML = (
+    f"{_BOX_TOP}"
+    "║      ❌ <b>INVALID ID!</b> ❌        ║\n"
+    f"{_BOX_BOTTOM}"
+    "⚠️ Please send a numeric User ID\n\n"
+    f"{_CANCEL_HINT}"
+)
+_RELOAD_SUCCESS_HTML = (
+    f"{_SUCCESS_HEADER}"
+    "🔄 Configuration reloaded!\n\n"
+    "All changes from\n"
+    "<code>menu_config.json</code>\n"
+    "have been loaded."
+)
+_WELCOME_SAVE_FAILED_HTML = (
+    f"{_ERROR_HEADER}"
+    "⚠️ Failed to save welcome\n"
+    "   message. Please try again."
+)
+_RESPONSE_SAVE_FAILED_HTML = (
+    f"{_ERROR_HEADER}"
+    "⚠️ Failed to save response.\n"
+    "   Please try again."
+)
+
+_EDIT_MAPPING_HEADER = f"{_BOX_TOP}║  🔗 <b>EDIT BUTTON MAPPING</b> 🔗  ║\n{_BOX_BOTTOM}"
+_EDIT_MAPPING_FOOTER = (
+    f"{_SEPARATOR}\n\n"
+    "✏️ Send the <b>button text</b> you want to remap\n"
+    "   (exact text from list above)\n\n"
+    "💡 <b>TIP:</b> Button mappings link button text\n"
+    "   to a menu name or action (main, back, admin)\n\n"
+    f"{_CANCEL_HINT}"
+)
+_MAPPING_UPDATED_HEADER = f"{_SUCCESS_HEADER}🔗 <b>Button Mapping Updated</b>\n\n"
+_CANCELLED_HTML = (
+    f"{_BOX_TOP}"
+    "║    ❌ <b>CANCELLED</b> ❌          ║\n"
+    f"{_BOX_BOTTOM}"
+    "🔙 Operation cancelled.\n"
+    "No changes were made."
+)
+_SESSION_EXPIRED_HTML = (
+    "⌛ <b>Session expired</b>\n\n"
+    "This admin action was left unfinished for too long and has been\n"
+    "cancelled. Open ⚙️ Settings to start again."
+)
+
+# user_data keys set by the admin conversations
+ADMIN_STATE_KEYS = (
+    'editing_button', 'removing_admin', 'adding_admin', 'editing_menu',
+    'button_to_edit', 'button_row', 'button_col', 'new_menu_name',
+    'new_menu_title', 'removing_button', 'mapping_button', 'retry_message_id',
+    'retry_text'
+)
+# Time of the last admin state write, used to evict abandoned conversations
+STATE_TIMESTAMP_KEY = '_admin_state_ts'
+_ADMIN_STATE_ALL_KEYS = ADMIN_STATE_KEYS + (STATE_TIMESTAMP_KEY,)
+
+# Sentinel for dict.pop when None is a legitimate stored value
+_MISSING = object()
+
+# Navigation buttons that get a warning before being renamed
+_NAV_BUTTONS = frozenset(("⬅ Back", "⬅️ Back", "🔝 Main Menu"))
+
+# Answers to the add-to-main question that count as "yes": the keyboard
+# label plus the short forms people type by hand (compared lowercased)
+_AFFIRMATIVE = frozenset(("✅ yes, add to main menu", "yes", "y", "✅"))
+
+# Names allowed for newly created menus: up to 64 ASCII letters, digits and
+# underscores, with at least one letter or digit
+_NEW_MENU_NAME_RE = re.compile(r"(?=.{1,64}\Z)[A-Za-z0-9_]*[A-Za-z0-9][A-Za-z0-9_]*")
+
+# Denial replies shared by every admin-gated handler
+_ACCESS_DENIED_ALERT = "⛔ Access Denied"
+_ACCESS_DENIED_HTML = (
+    "⛔ <b>Access Denied</b>\n\n"
+    "🚫 You are not authorized to access admin settings.\n\n"
+    "💡 Contact the bot owner to get admin access."
+)
+
+
+def admin_only(conv: bool = False):
+    """
+    Restrict a handler to admins
+    
+    Non-admins get an "Access Denied" reply and the wrapped handler is
+    never called.
+    
+    Args:
+        conv: True for conversation entry points, which must return
+              ConversationHandler.END when access is denied
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+            if update.effective_user.id not in self.config.admin_id_set:
+                query = update.callback_query
+                if query:
+                    await query.answer(_ACCESS_DENIED_ALERT, show_alert=True)
+                await update.effective_message.reply_html(_ACCESS_DENIED_HTML)
+                return ConversationHandler.END if conv else None
+            if not conv:
+                return await func(self, update, context, *args, **kwargs)
+            
+            # A new conversation starts from fresh, timestamped state
+            _pop_admin_state(context.user_data)
+            context.user_data[STATE_TIMESTAMP_KEY] = time.monotonic()
+            result = await func(self, update, context, *args, **kwargs)
+            if result == ConversationHandler.END:
+                _pop_admin_state(context.user_data)
+            return result
+        return wrapper
+    return decorator
+
+
+def conversation_step(func):
+    """
+    Guard an admin conversation state handler against evicted state
+    
+    The TTL sweeper drops the state of abandoned conversations but can't
+    end them; the next message in such a conversation lands here, is told
+    the session expired, and ends it instead of running on missing keys.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        user_data = context.user_data
+        if STATE_TIMESTAMP_KEY not in user_data:
+            await update.effective_message.reply_html(_SESSION_EXPIRED_HTML)
+            return ConversationHandler.END
+        result = await func(self, update, context, *args, **kwargs)
+        if result != ConversationHandler.END:
+            # Still going: the TTL counts from the latest step
+            user_data[STATE_TIMESTAMP_KEY] = time.monotonic()
+        return result
+    return wrapper
+
+
+def _pop_admin_state(user_data: Dict[Any, Any]) -> None:
+    """Remove the admin conversation keys and their timestamp from user_data"""
+    pop = user_data.pop
+    for key in _ADMIN_STATE_ALL_KEYS:
+        pop(key, None)
+
+
+def _ctx(update: Update) -> Tuple[int, Message, Optional[CallbackQuery]]:
+    """Resolve the user ID, the message to reply to and the callback query"""
+    query = update.callback_query
+    message = query.message if query else update.message
+    return update.effective_user.id, message, query
+
+
+async def _answer_and_send(update: Update, reply) -> None:
+    """
+    Await a reply coroutine, answering the callback query alongside it
+    
+    The two requests are independent, so they go out concurrently rather
+    than paying for two Telegram round-trips in a row.
+    """
+    query = update.callback_query
+    if query:
+        await asyncio.gather(query.answer(), reply)
+    else:
+        await reply
+
+
+class _StaticMarkupMixin:
+    """
+    Reply markup for keyboards that never change
+    
+    Every send converts the markup with to_dict(); this one converts
+    itself once and returns the same dict afterwards.
+    """
+    __slots__ = ()
+    
+    def to_dict(self, recursive: bool = True) -> Dict[str, Any]:
+        if not recursive:
+            return super().to_dict(recursive)
+        cached = getattr(self, '_dict_cache', None)
+        if cached is None:
+            cached = self._dict_cache = super().to_dict()
+        return cached
+
+
+class _StaticReplyKeyboard(_StaticMarkupMixin, ReplyKeyboardMarkup):
+    """ReplyKeyboardMarkup that serializes itself only once"""
+    __slots__ = ('_dict_cache',)
+
+
+class _StaticInlineKeyboard(_StaticMarkupMixin, InlineKeyboardMarkup):
+    """InlineKeyboardMarkup that serializes itself only once"""
+    __slots__ = ('_dict_cache',)
+
+
+# menu_handler imports this module, so its singleton is resolved on first use
+_menu_handler_instance = None
+
+
+def _menu_handler():
+    """Get the shared MenuHandler, importing it once"""
+    global _menu_handler_instance
+    if _menu_handler_instance is None:
+        from menu_handler import menu_handler
+        _menu_handler_instance = menu_handler
+    return _menu_handler_instance
 
 
 class AdminHandler:
     """Handles admin-only features"""
     
+    # Static reply keyboards, shared by every reply that shows them
+    _MANAGE_ADMINS_KB = _StaticReplyKeyboard(
+        [
+            ["➕ Add Admin", "➖ Remove Admin"],
+            ["🔙 Back to Settings"]
+        ],
+        resize_keyboard=True
+    )
+    _MENU_EDIT_KB = _StaticReplyKeyboard(
+        [
+            ["📝 Edit Title"],
+            ["🔘 Edit Button Text"],
+            ["➕ Add Button"],
+            ["➖ Remove Button"],
+            ["📋 View All Buttons"],
+            ["🔙 Back to Settings"]
+        ],
+        resize_keyboard=True
+    )
+    _ADD_TO_MAIN_KB = _StaticReplyKeyboard(
+        [
+            ["✅ Yes, add to main menu"],
+            ["❌ No, I'll do it manually"]
+        ],
+        resize_keyboard=True
+    )
+    
     def __init__(self):
         self.config = config
+        self._sweeper_task: Optional[asyncio.Task] = None
+        # Non-conversation admin buttons, keyed by button text
+        self._admin_actions = {
+            "👥 Manage Admins": self._action_manage_admins,
+            "🔙 Back to Settings": self._action_back_to_settings,
+            "🔄 Reload Config": self._action_reload_config,
+        }
+    
+    @staticmethod
+    def _set_state(context: ContextTypes.DEFAULT_TYPE, **values) -> None:
+        """Store conversation state in user_data and stamp it for TTL eviction"""
+        context.user_data.update(values)
+        context.user_data[STATE_TIMESTAMP_KEY] = time.monotonic()
+        # A new step starts with a fresh error message
+        context.user_data.pop('retry_message_id', None)
+        context.user_data.pop('retry_text', None)
+    
+    @staticmethod
+    async def _reply_retry(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str) -> None:
+        """
+        Tell the user their answer was rejected, reusing the last such reply
+        
+        A different mistake within one step edits the previous error
+        message in place instead of sending a new message for every retry.
+        Repeating the same mistake gets a fresh reply, since editing in the
+        same text would change nothing the user could see.
+        """
+        user_data = context.user_data
+        message_id = user_data.get('retry_message_id')
+        if message_id is not None and user_data.get('retry_text') != text:
+            try:
+                await context.bot.edit_message_text(
+                    text,
+                    chat_id=update.effective_chat.id,
+                    message_id=message_id,
+                    parse_mode='HTML'
+                )
+                user_data['retry_text'] = text
+                return
+            except BadRequest as e:
+                logger.debug(f"Could not edit error message, sending a new one: {e}")
+        sent = await update.message.reply_html(text)
+        user_data['retry_message_id'] = sent.message_id
+        user_data['retry_text'] = text
+    
+    @staticmethod
+    def _clear_admin_state(context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Drop every admin conversation key from user_data"""
+        _pop_admin_state(context.user_data)
+    
+    async def _finish_to_admin_menu(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        result_html: str = ''
+    ) -> int:
+        """
+        End a conversation on the admin menu
+        
+        The outcome of the conversation is shown above the menu in the
+        same message, so each finished flow costs a single send. All
+        admin conversation state is cleared.
+        """
+        self._clear_admin_state(context)
+        await _menu_handler().show_menu(
+            update, context, 'admin', add_to_history=False, prefix_html=result_html
+        )
+        return ConversationHandler.END
+    
+    @staticmethod
+    def sweep_stale_state(user_data_map, ttl: float = ADMIN_STATE_TTL) -> int:
+        """
+        Drop admin conversation keys that have not been touched within ttl
+        
+        Args:
+            user_data_map: Mapping of user_id to user_data (application.user_data)
+            ttl: Maximum age in seconds
+            
+        Returns:
+            Number of users whose state was evicted
+        """
+        cutoff = time.monotonic() - ttl
+        evicted = 0
+        for user_data in user_data_map.values():
+            stamp = user_data.get(STATE_TIMESTAMP_KEY)
+            if stamp is not None and stamp < cutoff:
+                _pop_admin_state(user_data)
+                evicted += 1
+        return evicted
+    
+    async def _sweep_loop(self, application: Application) -> None:
+        """Periodically evict abandoned admin conversation state"""
+        while True:
+            await asyncio.sleep(ADMIN_STATE_SWEEP_INTERVAL)
+            evicted = self.sweep_stale_state(application.user_data)
+            if evicted:
+                logger.info(f"Evicted stale admin state for {evicted} user(s)")
+    
+    def start_state_sweeper(self, application: Application) -> None:
+        """Start the background eviction task (the job queue is disabled)"""
+        if self._sweeper_task is None:
+            self._sweeper_task = asyncio.create_task(self._sweep_loop(application))
+    
+    def stop_state_sweeper(self) -> None:
+        """Cancel the background eviction task"""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            self._sweeper_task = None
     
     def is_admin(self, user_id: int) -> bool:
         """Check if user is an admin"""
-        return user_id in self.config.admin_ids
+        return self.config.is_admin(user_id)
     
+    @admin_only()
     async def show_admin_menu(
         self, 
         update: Update, 
         context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Show admin settings menu"""
-        from menu_handler import menu_handler
-        
-        user_id = update.effective_user.id
-        
         # Determine if this is from callback query or message
-        message = update.callback_query.message if update.callback_query else update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-                await message.reply_html(
-                    "⛔ <b>Access Denied</b>\n\n"
-                    "🚫 You are not authorized to access admin settings.\n\n"
-                    "💡 Contact the bot owner to get admin access."
-                )
-            else:
-                await message.reply_html(
-                    "⛔ <b>Access Denied</b>\n\n"
-                    "🚫 You are not authorized to access admin settings.\n\n"
-                    "💡 Contact the bot owner to get admin access."
-                )
-            return
-        
         # Show fancy admin welcome
         admin_count = len(self.config.admin_ids)
         menu_count = len(self.config.menus)
         
         admin_welcome = (
-            "╔═══════════════════════════════╗\n"
-            "║    ⚙️ <b>ADMIN PANEL</b> ⚙️         ║\n"
-            "╚═══════════════════════════════╝\n\n"
-            "📊 <b>STATUS</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "🟢 Bot: <b>Online</b>\n"
+            f"{_ADMIN_PANEL_HEADER}"
             f"👥 Admins: <b>{admin_count}</b>\n"
             f"📋 Menus: <b>{menu_count}</b>\n\n"
-            "🎨 <b>CONTENT MANAGEMENT</b>\n"
-            "Use buttons below to manage\n"
-            "your bot settings."
+            f"{_ADMIN_PANEL_FOOTER}"
         )
         
-        # Answer callback query if it's from inline button
-        if update.callback_query:
-            await update.callback_query.answer()
-        
-        await message.reply_html(admin_welcome)
-        
-        # Show admin menu
-        await menu_handler.show_menu(update, context, 'admin')
+        # Panel status and admin menu go out together
+        await _answer_and_send(
+            update,
+            _menu_handler().show_menu(update, context, 'admin', prefix_html=admin_welcome)
+        )
     
+    @admin_only(conv=True)
     async def start_edit_welcome(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start editing welcome message"""
-        user_id = update.effective_user.id
-        
-        # Get message object from either callback_query or regular message
-        message = update.callback_query.message if update.callback_query else update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        # Answer callback query if from inline button
-        if update.callback_query:
-            await update.callback_query.answer()
+        _, message, _ = _ctx(update)
         
         current_msg = self.config.welcome_message
-        await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║   📝 <b>EDIT WELCOME</b> 📝        ║\n"
-            "╚═══════════════════════════════╝\n\n"
-            "📄 <b>CURRENT MESSAGE:</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            f"<i>{current_msg}</i>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "✏️ <b>INSTRUCTIONS:</b>\n"
-            "Send your new welcome message\n\n"
-            "💡 <b>TIP:</b> You can use HTML:\n"
-            "• &lt;b&gt;bold&lt;/b&gt;\n"
-            "• &lt;i&gt;italic&lt;/i&gt;\n"
-            "• &lt;code&gt;monospace&lt;/code&gt;\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
-        )
+        await _answer_and_send(update, message.reply_html(
+            f"{_EDIT_WELCOME_HEADER}<i>{escape(current_msg)}</i>\n{_EDIT_WELCOME_FOOTER}"
+        ))
         return WAITING_WELCOME_MSG
     
+    @admin_only(conv=True)
     async def start_edit_response(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start editing button response"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
+        _, message, _ = _ctx(update)
         
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
-        
-        button_list = "\n".join([f"  • {k}" for k in self.config.responses.keys()])
+        button_list = self.config.response_keys_text
         button_count = len(self.config.responses)
         
-        await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║   💬 <b>EDIT RESPONSE</b> 💬       ║\n"
-            "╚═══════════════════════════════╝\n\n"
+        await _answer_and_send(update, message.reply_html(
+            f"{_EDIT_RESPONSE_HEADER}"
             f"📊 <b>AVAILABLE BUTTONS ({button_count}):</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"{_SEPARATOR}\n"
             f"{button_list}\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"{_SEPARATOR}\n\n"
             "✏️ Send the button text you\n"
             "   want to edit\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
-        )
+            f"{_CANCEL_HINT}"
+        ))
         return WAITING_RESPONSE_BUTTON
     
+    @admin_only(conv=True)
     async def start_add_admin(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start adding admin"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
+        _, message, _ = _ctx(update)
         
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
-        
-        admin_list = ', '.join(f"<code>{id}</code>" for id in self.config.admin_ids)
+        admin_list = self.config.admin_inline_text
         admin_count = len(self.config.admin_ids)
         
-        await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║     ➕ <b>ADD ADMIN</b> ➕          ║\n"
-            "╚═══════════════════════════════╝\n\n"
+        await _answer_and_send(update, message.reply_html(
+            f"{_ADD_ADMIN_HEADER}"
             f"👥 <b>CURRENT ADMINS ({admin_count}):</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"{_SEPARATOR}\n"
             f"{admin_list}\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "✏️ <b>INSTRUCTIONS:</b>\n"
-            "Send the User ID of the\n"
-            "new admin\n\n"
-            "💡 <b>TIP:</b> Users can see their\n"
-            "   ID when they /start the bot\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
-        )
-        context.user_data['adding_admin'] = True
+            f"{_ADD_ADMIN_FOOTER}"
+        ))
+        self._set_state(context, adding_admin=True)
         return WAITING_ADMIN_ID
     
+    @admin_only(conv=True)
     async def start_remove_admin(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start removing admin"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
+        _, message, _ = _ctx(update)
         
-        if len(self.config.admin_ids) <= 1:
-            await message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║     ⚠️ <b>WARNING!</b> ⚠️          ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                "❌ Cannot remove admin!\n\n"
-                "There must be at least one admin."
-            )
+        if len(self.config.admin_id_set) <= 1:
+            await _answer_and_send(update, message.reply_html(_LAST_ADMIN_HTML))
             return ConversationHandler.END
         
-        admin_list = "\n".join([f"  • <code>{aid}</code>" for aid in self.config.admin_ids])
+        admin_list = self.config.admin_list_text
         admin_count = len(self.config.admin_ids)
         
-        await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║    ➖ <b>REMOVE ADMIN</b> ➖        ║\n"
-            "╚═══════════════════════════════╝\n\n"
+        await _answer_and_send(update, message.reply_html(
+            f"{_REMOVE_ADMIN_HEADER}"
             f"👥 <b>CURRENT ADMINS ({admin_count}):</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"{_SEPARATOR}\n"
             f"{admin_list}\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"{_SEPARATOR}\n\n"
             "✏️ Send the User ID to remove\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
-        )
-        context.user_data['removing_admin'] = True
+            f"{_CANCEL_HINT}"
+        ))
+        self._set_state(context, removing_admin=True)
         return WAITING_ADMIN_ID
     
+    @admin_only()
     async def handle_admin_action(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Handle non-conversation admin actions"""
-        user_id = update.effective_user.id
-        
         # Get button text from either message or callback query
-        if update.callback_query:
-            button_text = update.callback_query.data.replace("btn:", "")
-            message = update.callback_query.message
-        else:
-            button_text = update.message.text
-            message = update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            else:
-                await message.reply_text("⛔ Access Denied!")
-            return
-        
-        # Handle different admin actions
-        if button_text == "👥 Manage Admins":
-            admin_list = self.config.admin_ids
-            admin_text = "\n".join([f"  • <code>{aid}</code>" for aid in admin_list]) if admin_list else "None"
-            admin_count = len(admin_list)
-            
-            keyboard = [
-                ["➕ Add Admin", "➖ Remove Admin"],
-                ["🔙 Back to Settings"]
-            ]
-            reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-            
+        _, message, query = _ctx(update)
+        button_text = query.data.replace("btn:", "") if query else message.text
+        
+        # Edit Menu, Add Menu and Delete Menu are conversation entry points,
+        # so they have no entry here
+        action = self._admin_actions.get(button_text)
+        if action:
+            await action(update, context, message)
+    
+    async def _action_manage_admins(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        message: Message
+    ) -> None:
+        """Show the admin list with the add/remove keyboard"""
+        admin_list = self.config.admin_ids
+        admin_text = self.config.admin_list_text if admin_list else "None"
+        admin_count = len(admin_list)
+        
+        await _answer_and_send(update, message.reply_html(
+            f"{_ADMIN_MANAGER_HEADER}"
+            f"📊 <b>CURRENT ADMINS ({admin_count}):</b>\n"
+            f"{_SEPARATOR}\n"
+            f"{admin_text}\n"
+            f"{_SEPARATOR}\n\n"
+            f"👤 <b>YOUR ID:</b> <code>{update.effective_user.id}</code>\n\n"
+            "❓ What would you like to do?",
+            reply_markup=self._MANAGE_ADMINS_KB
+        ))
+    
+    async def _action_back_to_settings(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        message: Message
+    ) -> None:
+        """Return to the admin menu"""
+        await _answer_and_send(
+            update,
+            _menu_handler().show_menu(update, context, 'admin', add_to_history=False)
+        )
+    
+    async def _action_reload_config(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        message: Message
+    ) -> None:
+        """Reload menu_config.json from disk"""
+        query = update.callback_query
+        try:
+            await self.config.reload_config_async()
             # Answer callback query if from inline button
-            if update.callback_query:
-                await update.callback_query.answer()
+            if query:
+                await query.answer("✅ Config reloaded!", show_alert=True)
             
+            await message.reply_html(_RELOAD_SUCCESS_HTML)
+        except Exception as e:
+            if query:
+                await query.answer("❌ Error reloading config", show_alert=True)
+                
             await message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║   👥 <b>ADMIN MANAGER</b> 👥       ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"📊 <b>CURRENT ADMINS ({admin_count}):</b>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                f"{admin_text}\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-                f"👤 <b>YOUR ID:</b> <code>{user_id}</code>\n\n"
-                "❓ What would you like to do?",
-                reply_markup=reply_markup
+                f"{_ERROR_HEADER}"
+                "⚠️ <b>Error reloading config:</b>\n"
+                f"<code>{str(e)}</code>"
             )
-        
-        elif button_text == "🔙 Back to Settings":
-            from menu_handler import menu_handler
-            # Answer callback query if from inline button
-            if update.callback_query:
-                await update.callback_query.answer()
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        
-        elif button_text == "🔄 Reload Config":
-            try:
-                self.config.reload_config()
-                # Answer callback query if from inline button
-                if update.callback_query:
-                    await update.callback_query.answer("✅ Config reloaded!", show_alert=True)
-                
-                await message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║      ✅ <b>SUCCESS!</b> ✅          ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    "🔄 Configuration reloaded!\n\n"
-                    "All changes from\n"
-                    "<code>menu_config.json</code>\n"
-                    "have been loaded."
-                )
-            except Exception as e:
-                if update.callback_query:
-                    await update.callback_query.answer("❌ Error reloading config", show_alert=True)
-                    
-                await message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║       ❌ <b>ERROR!</b> ❌           ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    f"⚠️ <b>Error reloading config:</b>\n"
-                    f"<code>{str(e)}</code>"
-                )
-        
-        elif button_text == "🔧 Edit Menu":
-            # This is now handled by the conversation handler
-            pass
-        
-        # These are handled by conversation handlers now
-        elif button_text == "➕ Add Menu" or button_text == "🗑️ Delete Menu":
-            pass
     
+    @conversation_step
     async def receive_welcome_message(
         self,
         update: Update,
@@ -353,31 +680,22 @@ class AdminHandler:
         """Receive and save new welcome message"""
         new_message = update.message.text
         
-        if self.config.update_welcome_message(new_message):
-            from menu_handler import menu_handler
-            
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║      ✅ <b>SUCCESS!</b> ✅          ║\n"
-                "╚═══════════════════════════════╝\n\n"
+        if await self.config.update_welcome_message(new_message):
+            return await self._finish_to_admin_menu(
+                update, context,
+                f"{_SUCCESS_HEADER}"
                 "🎉 Welcome message updated!\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"{_SEPARATOR}\n"
                 "📄 <b>NEW MESSAGE:</b>\n"
-                f"<i>{new_message}</i>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-            )
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        else:
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║       ❌ <b>ERROR!</b> ❌           ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                "⚠️ Failed to save welcome\n"
-                "   message. Please try again."
+                f"<i>{escape(new_message)}</i>\n"
+                f"{_SEPARATOR}"
             )
         
+        await update.message.reply_html(_WELCOME_SAVE_FAILED_HTML)
+        self._clear_admin_state(context)
         return ConversationHandler.END
     
+    @conversation_step
     async def receive_response_button(
         self,
         update: Update,
@@ -385,26 +703,24 @@ class AdminHandler:
     ) -> int:
         """Receive button text for response editing"""
         button_text = update.message.text
-        context.user_data['editing_button'] = button_text
+        self._set_state(context, editing_button=button_text)
         
         current_response = self.config.responses.get(button_text, "Not set")
         
         await update.message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║   💬 <b>EDIT RESPONSE</b> 💬       ║\n"
-            "╚═══════════════════════════════╝\n\n"
-            f"🔘 <b>BUTTON:</b> {button_text}\n\n"
+            f"{_EDIT_RESPONSE_HEADER}"
+            f"🔘 <b>BUTTON:</b> {escape(button_text)}\n\n"
             "📄 <b>CURRENT RESPONSE:</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            f"<i>{current_response}</i>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"{_SEPARATOR}\n"
+            f"<i>{escape(current_response)}</i>\n"
+            f"{_SEPARATOR}\n\n"
             "✏️ Send the new response text\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
+            f"{_CANCEL_HINT}"
         )
         
         return WAITING_RESPONSE_TEXT
     
+    @conversation_step
     async def receive_response_text(
         self,
         update: Update,
@@ -414,145 +730,112 @@ class AdminHandler:
         button_text = context.user_data.get('editing_button')
         new_response = update.message.text
         
-        if self.config.update_response(button_text, new_response):
-            from menu_handler import menu_handler
-            
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║      ✅ <b>SUCCESS!</b> ✅          ║\n"
-                "╚═══════════════════════════════╝\n\n"
+        if not button_text:
+            await update.message.reply_text("❌ Error: No button selected")
+            self._clear_admin_state(context)
+            return ConversationHandler.END
+        
+        if await self.config.update_response(button_text, new_response):
+            return await self._finish_to_admin_menu(
+                update, context,
+                f"{_SUCCESS_HEADER}"
                 "🎉 Response updated!\n\n"
-                f"🔘 <b>BUTTON:</b> {button_text}\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                f"🔘 <b>BUTTON:</b> {escape(button_text)}\n\n"
+                f"{_SEPARATOR}\n"
                 "📄 <b>NEW RESPONSE:</b>\n"
-                f"<i>{new_response}</i>\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-            )
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        else:
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║       ❌ <b>ERROR!</b> ❌           ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                "⚠️ Failed to save response.\n"
-                "   Please try again."
+                f"<i>{escape(new_response)}</i>\n"
+                f"{_SEPARATOR}"
             )
         
-        context.user_data.pop('editing_button', None)
+        await update.message.reply_html(_RESPONSE_SAVE_FAILED_HTML)
+        self._clear_admin_state(context)
         return ConversationHandler.END
     
+    @conversation_step
     async def receive_admin_id(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive and process admin ID"""
-        from menu_handler import menu_handler
-        
-        text = update.message.text
+        text = update.message.text.strip()
         
-        try:
-            user_id = int(text)
-        except ValueError:
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║      ❌ <b>INVALID ID!</b> ❌        ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                "⚠️ Please send a numeric User ID\n\n"
-                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                "Type /cancel to abort"
-            )
+        # Telegram user IDs are positive integers; isdecimal() only accepts
+        # characters int() can parse, so no exception on bad input
+        if not text.isdecimal() or len(text) > 20:
+            await update.message.reply_html(_INVALID_ID_HTML)
             return WAITING_ADMIN_ID
+        user_id = int(text)
         
         removing = context.user_data.get('removing_admin', False)
         adding = context.user_data.get('adding_admin', False)
+        result = ''
         
+        # Rejected IDs keep the conversation open so the admin can retry
         if removing:
             if user_id == update.effective_user.id:
+                await update.message.reply_html(_SELF_REMOVE_HTML)
+                self._set_state(context)
+                return WAITING_ADMIN_ID
+            if not await self.config.remove_admin(user_id):
                 await update.message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║     ⚠️ <b>WARNING!</b> ⚠️          ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    "❌ You cannot remove yourself\n"
-                    "   as admin!"
-                )
-            elif self.config.remove_admin(user_id):
-                await update.message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║      ✅ <b>SUCCESS!</b> ✅          ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    "👤 Admin removed successfully!\n\n"
-                    f"User ID <code>{user_id}</code> is no\n"
-                    "longer an admin."
-                )
-            else:
-                await update.message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║       ❌ <b>ERROR!</b> ❌           ║\n"
-                    "╚═══════════════════════════════╝\n\n"
+                    f"{_ERROR_HEADER}"
                     f"User ID <code>{user_id}</code> is\n"
-                    "not an admin."
+                    "not an admin.\n\n"
+                    f"{_CANCEL_HINT}"
                 )
-            context.user_data.pop('removing_admin', None)
+                self._set_state(context)
+                return WAITING_ADMIN_ID
+            result = (
+                f"{_SUCCESS_HEADER}"
+                "👤 Admin removed successfully!\n\n"
+                f"User ID <code>{user_id}</code> is no\n"
+                "longer an admin."
+            )
         elif adding:
-            if self.config.add_admin(user_id):
+            if not await self.config.add_admin(user_id):
                 await update.message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║      ✅ <b>SUCCESS!</b> ✅          ║\n"
-                    "╚═══════════════════════════════╝\n\n"
-                    "👤 Admin added successfully!\n\n"
-                    f"User ID <code>{user_id}</code> is now\n"
-                    "an admin."
-                )
-            else:
-                await update.message.reply_html(
-                    "╔═══════════════════════════════╗\n"
-                    "║     ⚠️ <b>WARNING!</b> ⚠️          ║\n"
-                    "╚═══════════════════════════════╝\n\n"
+                    f"{_WARNING_HEADER}"
                     f"User ID <code>{user_id}</code> is\n"
-                    "already an admin."
+                    "already an admin.\n\n"
+                    f"{_CANCEL_HINT}"
                 )
-            context.user_data.pop('adding_admin', None)
+                self._set_state(context)
+                return WAITING_ADMIN_ID
+            result = (
+                f"{_SUCCESS_HEADER}"
+                "👤 Admin added successfully!\n\n"
+                f"User ID <code>{user_id}</code> is now\n"
+                "an admin."
+            )
         
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @admin_only(conv=True)
     async def start_edit_menu(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start menu editing workflow"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
+        _, message, _ = _ctx(update)
         
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
-        
-        menu_list = "\n".join([f"  • <code>{k}</code>" for k in self.config.menus.keys()])
+        menu_list = self.config.menu_keys_text
         menu_count = len(self.config.menus)
         
-        await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║     🔧 <b>EDIT MENU</b> 🔧         ║\n"
-            "╚═══════════════════════════════╝\n\n"
+        await _answer_and_send(update, message.reply_html(
+            f"{_EDIT_MENU_HEADER}"
             f"📊 <b>AVAILABLE MENUS ({menu_count}):</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"{_SEPARATOR}\n"
             f"{menu_list}\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            f"{_SEPARATOR}\n\n"
             "✏️ Send the menu name to edit\n"
             "   (e.g., <code>main</code>)\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
-        )
+            f"{_CANCEL_HINT}"
+        ))
         return WAITING_MENU_SELECT
     
+    @conversation_step
     async def receive_menu_selection(
         self,
         update: Update,
@@ -560,46 +843,48 @@ class AdminHandler:
     ) -> int:
         """Receive which menu to edit"""
         menu_name = update.message.text.strip()
+        menu_data = self.config.menus.get(menu_name)
         
-        if menu_name not in self.config.menus:
+        if menu_data is None:
             await update.message.reply_text(
-                f"❌ Menu '<code>{menu_name}</code>' not found.\n\n"
+                f"❌ Menu '<code>{escape(menu_name)}</code>' not found.\n\n"
                 "Please send a valid menu name or /cancel to abort.",
                 parse_mode='HTML'
             )
             return WAITING_MENU_SELECT
         
         # Store selected menu
-        context.user_data['editing_menu'] = menu_name
-        menu_data = self.config.get_menu(menu_name)
+        self._set_state(context, editing_menu=menu_name)
         
         # Show menu details
         title = menu_data.get('title', 'No title')
         buttons = menu_data.get('buttons', [])
-        button_preview = "\n".join([f"  Row {i+1}: {row}" for i, row in enumerate(buttons[:3])])
+        button_preview = "\n".join(f"  Row {i+1}: {escape(str(row))}" for i, row in enumerate(buttons[:3]))
         if len(buttons) > 3:
             button_preview += f"\n  ... and {len(buttons)-3} more rows"
         
-        keyboard = [
-            ["📝 Edit Title"],
-            ["🔘 Edit Button Text"],
-            ["➕ Add Button"],
-            ["➖ Remove Button"],
-            ["📋 View All Buttons"],
-            ["🔙 Back to Settings"]
-        ]
-        reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-        
         await update.message.reply_text(
-            f"🔧 <b>Editing Menu: {menu_name}</b>\n\n"
-            f"<b>Current Title:</b>\n{title}\n\n"
+            f"🔧 <b>Editing Menu: {escape(menu_name)}</b>\n\n"
+            f"<b>Current Title:</b>\n{escape(title)}\n\n"
             f"<b>Button Preview:</b>\n{button_preview}\n\n"
             "What would you like to do?",
             parse_mode='HTML',
-            reply_markup=reply_markup
+            reply_markup=self._MENU_EDIT_KB
         )
         return WAITING_MENU_ACTION
     
+    @staticmethod
+    def _format_buttons_html(buttons: list) -> str:
+        """Number every button in a menu, one per line, with its row"""
+        return "\n".join(
+            f"{idx}. <code>{escape(button)}</code> (Row {row_idx+1})"
+            for idx, (row_idx, button) in enumerate(
+                ((row_idx, button) for row_idx, row in enumerate(buttons) for button in row),
+                1
+            )
+        )
+    
+    @conversation_step
     async def receive_menu_action(
         self,
         update: Update,
@@ -608,34 +893,25 @@ class AdminHandler:
         """Handle menu editing action"""
         action = update.message.text
         menu_name = context.user_data.get('editing_menu')
+        menu_data = self.config.get_menu(menu_name)
+        buttons = menu_data.get('buttons', [])
         
         if action == "📝 Edit Title":
-            current_title = self.config.get_menu(menu_name).get('title', '')
+            current_title = menu_data.get('title', '')
             await update.message.reply_text(
-                f"📝 <b>Edit Title for '{menu_name}'</b>\n\n"
-                f"Current title:\n<code>{current_title}</code>\n\n"
+                f"📝 <b>Edit Title for '{escape(menu_name)}'</b>\n\n"
+                f"Current title:\n<code>{escape(current_title)}</code>\n\n"
                 "Send me the new title, or /cancel to abort.",
                 parse_mode='HTML'
             )
             return WAITING_NEW_TITLE
         
         elif action == "🔘 Edit Button Text":
-            menu_data = self.config.get_menu(menu_name)
-            buttons = menu_data.get('buttons', [])
-            
-            # Create a flat list of all buttons with their positions
-            button_list = []
-            for row_idx, row in enumerate(buttons):
-                for col_idx, button in enumerate(row):
-                    button_list.append((button, row_idx, col_idx))
-            
-            button_text = ""
-            for idx, (button, row, col) in enumerate(button_list, 1):
-                button_text += f"{idx}. <code>{button}</code> (Row {row+1})\n"
+            buttons_html = self._format_buttons_html(buttons)
             
             await update.message.reply_text(
-                f"🔘 <b>Edit Button in '{menu_name}'</b>\n\n"
-                f"Current buttons:\n{button_text}\n"
+                f"🔘 <b>Edit Button in '{escape(menu_name)}'</b>\n\n"
+                f"Current buttons:\n{buttons_html}\n\n"
                 "Send me the button text you want to change (exact text), or /cancel to abort.\n\n"
                 "Example: <code>Button inside enquiry 1</code>",
                 parse_mode='HTML'
@@ -644,7 +920,7 @@ class AdminHandler:
         
         elif action == "➕ Add Button":
             await update.message.reply_text(
-                f"➕ <b>Add Button to '{menu_name}'</b>\n\n"
+                f"➕ <b>Add Button to '{escape(menu_name)}'</b>\n\n"
                 "Send me the new button text.\n"
                 "Example: <code>📞 Contact Us</code> or <code>🏠 Home</code>\n\n"
                 "Send /cancel to abort.",
@@ -653,40 +929,26 @@ class AdminHandler:
             return WAITING_NEW_BUTTON_NAME
         
         elif action == "➖ Remove Button":
-            menu_data = self.config.get_menu(menu_name)
-            buttons = menu_data.get('buttons', [])
-            
-            # Create a flat list of all buttons with their positions
-            button_list = []
-            for row_idx, row in enumerate(buttons):
-                for col_idx, button in enumerate(row):
-                    button_list.append((button, row_idx, col_idx))
-            
-            button_text = ""
-            for idx, (button, row, col) in enumerate(button_list, 1):
-                button_text += f"{idx}. <code>{button}</code> (Row {row+1})\n"
+            buttons_html = self._format_buttons_html(buttons)
             
             await update.message.reply_text(
-                f"➖ <b>Remove Button from '{menu_name}'</b>\n\n"
-                f"Current buttons:\n{button_text}\n"
+                f"➖ <b>Remove Button from '{escape(menu_name)}'</b>\n\n"
+                f"Current buttons:\n{buttons_html}\n\n"
                 "Send me the exact button text to remove, or /cancel to abort.\n\n"
                 "⚠️ <b>Warning:</b> Navigation buttons (Back/Main Menu) should not be removed!",
                 parse_mode='HTML'
             )
-            context.user_data['removing_button'] = True
+            self._set_state(context, removing_button=True)
             return WAITING_BUTTON_SELECT
         
         elif action == "📋 View All Buttons":
-            menu_data = self.config.get_menu(menu_name)
-            buttons = menu_data.get('buttons', [])
-            
-            button_text = ""
-            for i, row in enumerate(buttons):
-                button_text += f"<b>Row {i+1}:</b> {row}\n"
+            buttons_html = "\n".join(
+                f"<b>Row {i+1}:</b> {escape(str(row))}" for i, row in enumerate(buttons)
+            )
             
             await update.message.reply_text(
-                f"📋 <b>All Buttons in '{menu_name}'</b>\n\n"
-                f"{button_text}\n"
+                f"📋 <b>All Buttons in '{escape(menu_name)}'</b>\n\n"
+                f"{buttons_html}\n\n"
                 "Tap '🔘 Edit Button Text' to rename a button.\n"
                 "Tap '➕ Add Button' to add a new button.",
                 parse_mode='HTML'
@@ -694,48 +956,39 @@ class AdminHandler:
             return WAITING_MENU_ACTION
         
         elif action == "🔙 Back to Settings":
-            from menu_handler import menu_handler
-            context.user_data.pop('editing_menu', None)
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-            return ConversationHandler.END
+            return await self._finish_to_admin_menu(update, context)
         
         return WAITING_MENU_ACTION
     
+    @conversation_step
     async def receive_new_title(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive and save new menu title"""
-        from menu_handler import menu_handler
-        
         new_title = update.message.text
         menu_name = context.user_data.get('editing_menu')
         
         # Update the menu title
-        if menu_name in self.config.config['menus']:
-            self.config.config['menus'][menu_name]['title'] = new_title
+        menu_data = self.config.menus.get(menu_name)
+        if menu_data is not None:
+            menu_data['title'] = new_title
             
-            if self.config.save_config():
-                await update.message.reply_text(
+            if await self.config.save_config_async():
+                result = (
                     f"✅ <b>Title updated successfully!</b>\n\n"
-                    f"Menu: <code>{menu_name}</code>\n"
-                    f"New title: {new_title}",
-                    parse_mode='HTML'
+                    f"Menu: <code>{escape(menu_name)}</code>\n"
+                    f"New title: {escape(new_title)}"
                 )
             else:
-                await update.message.reply_text(
-                    "❌ Failed to save changes. Please try again."
-                )
+                result = "❌ Failed to save changes. Please try again."
         else:
-            await update.message.reply_text(
-                f"❌ Menu '{menu_name}' not found."
-            )
+            result = f"❌ Menu '{escape(menu_name)}' not found."
         
-        context.user_data.pop('editing_menu', None)
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @conversation_step
     async def receive_button_selection(
         self,
         update: Update,
@@ -749,169 +1002,140 @@ class AdminHandler:
         
         # Check if we're removing a button
         if context.user_data.get('removing_button'):
-            # Find and remove the button
-            found = False
-            for row_idx, row in enumerate(buttons):
-                if old_button_text in row:
-                    row.remove(old_button_text)
-                    # If row is now empty, remove it
-                    if not row:
-                        buttons.pop(row_idx)
-                    found = True
-                    break
+            # Find the button (first occurrence) and remove it
+            position = self.config.find_button(menu_name, old_button_text)
             
-            if not found:
-                await update.message.reply_text(
-                    f"❌ Button '<code>{old_button_text}</code>' not found in this menu.\n\n"
-                    "Please send the exact button text, or /cancel to abort.",
-                    parse_mode='HTML'
+            if position is None:
+                await self._reply_retry(
+                    update, context,
+                    f"❌ Button '<code>{escape(old_button_text)}</code>' not found in this menu.\n\n"
+                    "Please send the exact button text, or /cancel to abort."
                 )
                 return WAITING_BUTTON_SELECT
             
-            # Save the updated menu
-            if menu_name in self.config.config['menus']:
-                self.config.config['menus'][menu_name]['buttons'] = buttons
-                
-                # Remove button mapping if exists
-                if old_button_text in self.config.config.get('button_mapping', {}):
-                    del self.config.config['button_mapping'][old_button_text]
-                
-                # Remove response if exists
-                if old_button_text in self.config.config.get('responses', {}):
-                    del self.config.config['responses'][old_button_text]
-                
-                if self.config.save_config():
-                    from menu_handler import menu_handler
-                    await update.message.reply_text(
-                        f"✅ <b>Button removed!</b>\n\n"
-                        f"Removed: <code>{old_button_text}</code>\n"
-                        f"From menu: <code>{menu_name}</code>",
-                        parse_mode='HTML'
-                    )
-                    context.user_data.pop('removing_button', None)
-                    context.user_data.pop('editing_menu', None)
-                    await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-                    return ConversationHandler.END
+            row_idx, col_idx = position
+            row = buttons[row_idx]
+            del row[col_idx]
+            # If row is now empty, remove it
+            if not row:
+                del buttons[row_idx]
+            self.config.invalidate_button_index(menu_name)
+            
+            # Remove the button's mapping and response, if any
+            cfg = self.config.config
+            cfg['button_mapping'].pop(old_button_text, None)
+            cfg.get('responses', {}).pop(old_button_text, None)
+            
+            if await self.config.save_config_async():
+                return await self._finish_to_admin_menu(
+                    update, context,
+                    f"✅ <b>Button removed!</b>\n\n"
+                    f"Removed: <code>{escape(old_button_text)}</code>\n"
+                    f"From menu: <code>{escape(menu_name)}</code>"
+                )
             
             await update.message.reply_text("❌ Failed to remove button.")
             return WAITING_BUTTON_SELECT
         
         # Otherwise, we're editing a button
         # Find the button
-        found = False
-        for row_idx, row in enumerate(buttons):
-            for col_idx, button in enumerate(row):
-                if button == old_button_text:
-                    found = True
-                    context.user_data['button_to_edit'] = old_button_text
-                    context.user_data['button_row'] = row_idx
-                    context.user_data['button_col'] = col_idx
-                    break
-            if found:
-                break
-        
-        if not found:
-            await update.message.reply_text(
-                f"❌ Button '<code>{old_button_text}</code>' not found in this menu.\n\n"
-                "Please send the exact button text, or /cancel to abort.",
-                parse_mode='HTML'
+        position = self.config.find_button(menu_name, old_button_text)
+        
+        if position is None:
+            await self._reply_retry(
+                update, context,
+                f"❌ Button '<code>{escape(old_button_text)}</code>' not found in this menu.\n\n"
+                "Please send the exact button text, or /cancel to abort."
             )
             return WAITING_BUTTON_SELECT
         
+        row_idx, col_idx = position
+        self._set_state(
+            context,
+            button_to_edit=old_button_text,
+            button_row=row_idx,
+            button_col=col_idx
+        )
+        
         # Check if button has special navigation (Back, Main Menu)
-        is_special = old_button_text in ["⬅ Back", "⬅️ Back", "🔝 Main Menu"]
+        is_special = old_button_text in _NAV_BUTTONS
         warning = ""
         if is_special:
             warning = "\n\n⚠️ <b>Warning:</b> This is a navigation button. Changing it may affect menu navigation!"
         
         await update.message.reply_text(
             f"🔘 <b>Renaming Button</b>\n\n"
-            f"Current text: <code>{old_button_text}</code>{warning}\n\n"
+            f"Current text: <code>{escape(old_button_text)}</code>{warning}\n\n"
             "Send me the new button text, or /cancel to abort.",
             parse_mode='HTML'
         )
         return WAITING_NEW_BUTTON_TEXT
     
+    @conversation_step
     async def receive_new_button_text(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive and save new button text"""
-        from menu_handler import menu_handler
-        
         new_button_text = update.message.text.strip()
         old_button_text = context.user_data.get('button_to_edit')
         menu_name = context.user_data.get('editing_menu')
         row_idx = context.user_data.get('button_row')
         col_idx = context.user_data.get('button_col')
         
+        cfg = self.config.config
+        menu = cfg['menus'].get(menu_name)
+        
         # Update the button in the menu
-        if menu_name in self.config.config['menus']:
-            self.config.config['menus'][menu_name]['buttons'][row_idx][col_idx] = new_button_text
+        if menu is not None:
+            menu['buttons'][row_idx][col_idx] = new_button_text
+            self.config.invalidate_button_index(menu_name)
             
             # Update button_mapping if this button was mapped
-            if old_button_text in self.config.config['button_mapping']:
-                mapped_value = self.config.config['button_mapping'][old_button_text]
-                del self.config.config['button_mapping'][old_button_text]
-                self.config.config['button_mapping'][new_button_text] = mapped_value
+            mapping = cfg['button_mapping']
+            target = mapping.pop(old_button_text, _MISSING)
+            if target is not _MISSING:
+                mapping[new_button_text] = target
                 
             # Update responses if this button had a response
-            if 'responses' in self.config.config and old_button_text in self.config.config['responses']:
-                response_value = self.config.config['responses'][old_button_text]
-                del self.config.config['responses'][old_button_text]
-                self.config.config['responses'][new_button_text] = response_value
+            responses = cfg.get('responses', {})
+            response = responses.pop(old_button_text, _MISSING)
+            if response is not _MISSING:
+                responses[new_button_text] = response
             
-            if self.config.save_config():
+            if await self.config.save_config_async():
                 update_info = f"✅ <b>Button renamed successfully!</b>\n\n"
-                update_info += f"Menu: <code>{menu_name}</code>\n"
-                update_info += f"Old text: <code>{old_button_text}</code>\n"
-                update_info += f"New text: <code>{new_button_text}</code>\n"
+                update_info += f"Menu: <code>{escape(menu_name)}</code>\n"
+                update_info += f"Old text: <code>{escape(old_button_text)}</code>\n"
+                update_info += f"New text: <code>{escape(new_button_text)}</code>\n"
                 
                 # Inform about what was updated
-                if old_button_text in self.config.button_mapping or new_button_text in self.config.button_mapping:
+                if target is not _MISSING or new_button_text in mapping:
                     update_info += "\n✓ Button mapping updated"
-                if old_button_text in self.config.responses or new_button_text in self.config.responses:
+                if response is not _MISSING or new_button_text in responses:
                     update_info += "\n✓ Button response preserved"
                 
-                await update.message.reply_text(update_info, parse_mode='HTML')
+                result = update_info
             else:
-                await update.message.reply_text(
-                    "❌ Failed to save changes. Please try again."
-                )
+                result = "❌ Failed to save changes. Please try again."
         else:
-            await update.message.reply_text(
-                f"❌ Menu '{menu_name}' not found."
-            )
-        
-        # Clean up
-        context.user_data.pop('editing_menu', None)
-        context.user_data.pop('button_to_edit', None)
-        context.user_data.pop('button_row', None)
-        context.user_data.pop('button_col', None)
+            result = f"❌ Menu '{escape(menu_name)}' not found."
         
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @admin_only(conv=True)
     async def start_add_menu(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start adding a new menu"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_text("⛔ Access Denied!")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
+        _, message, query = _ctx(update)
+        if query:
+            await query.answer()
         
-        current_menus = ", ".join([f"<code>{m}</code>" for m in self.config.menus.keys()])
+        current_menus = self.config.menu_inline_text
         
         await message.reply_text(
             "➕ <b>Create New Menu</b>\n\n"
@@ -923,6 +1147,7 @@ class AdminHandler:
         )
         return WAITING_NEW_MENU_NAME
     
+    @conversation_step
     async def receive_new_menu_name(
         self,
         update: Update,
@@ -932,26 +1157,28 @@ class AdminHandler:
         menu_name = update.message.text.strip().lower().replace(' ', '_')
         
         # Validate menu name
-        if not menu_name.replace('_', '').isalnum():
-            await update.message.reply_text(
-                "❌ Invalid menu name. Use only letters, numbers, and underscores.\n\n"
+        if not _NEW_MENU_NAME_RE.fullmatch(menu_name):
+            await self._reply_retry(
+                update, context,
+                "❌ Invalid menu name. Use only letters, numbers, and underscores "
+                "(up to 64 characters).\n\n"
                 "Try again or send /cancel to abort."
             )
             return WAITING_NEW_MENU_NAME
         
         if menu_name in self.config.menus:
-            await update.message.reply_text(
-                f"❌ Menu '<code>{menu_name}</code>' already exists!\n\n"
-                "Choose a different name or send /cancel to abort.",
-                parse_mode='HTML'
+            await self._reply_retry(
+                update, context,
+                f"❌ Menu '<code>{escape(menu_name)}</code>' already exists!\n\n"
+                "Choose a different name or send /cancel to abort."
             )
             return WAITING_NEW_MENU_NAME
         
         # Store menu name for next step
-        context.user_data['new_menu_name'] = menu_name
+        self._set_state(context, new_menu_name=menu_name)
         
         await update.message.reply_text(
-            f"✅ Menu name: <code>{menu_name}</code>\n\n"
+            f"✅ Menu name: <code>{escape(menu_name)}</code>\n\n"
             "Now send me the menu <b>title</b> (what users will see).\n"
             "Example: <code>🛠️ Our Services</code> or <code>📦 Products</code>\n\n"
             "Send /cancel to abort.",
@@ -959,6 +1186,7 @@ class AdminHandler:
         )
         return WAITING_NEW_MENU_TITLE
     
+    @conversation_step
     async def receive_new_menu_title(
         self,
         update: Update,
@@ -968,65 +1196,47 @@ class AdminHandler:
         menu_title = update.message.text.strip()
         menu_name = context.user_data.get('new_menu_name')
         
-        if self.config.add_menu(menu_name, menu_title):
+        if await self.config.add_menu(menu_name, menu_title):
             # Store menu info for next step
-            context.user_data['new_menu_title'] = menu_title
+            self._set_state(context, new_menu_title=menu_title)
             
             # Ask if they want to add button to main menu
-            keyboard = [
-                ["✅ Yes, add to main menu"],
-                ["❌ No, I'll do it manually"]
-            ]
-            reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-            
-            await update.message.reply_text(
+            await update.message.reply_html(
                 f"✅ <b>Menu Created!</b>\n\n"
-                f"Name: <code>{menu_name}</code>\n"
-                f"Title: {menu_title}\n\n"
+                f"Name: <code>{escape(menu_name)}</code>\n"
+                f"Title: {escape(menu_title)}\n\n"
                 f"❓ <b>Add button to main menu?</b>\n\n"
                 f"This will create a button in your main menu that links to this new menu.\n\n"
                 f"Recommended: <b>Yes</b> ✅",
-                parse_mode='HTML',
-                reply_markup=reply_markup
+                reply_markup=self._ADD_TO_MAIN_KB
             )
             return WAITING_ADD_TO_MAIN
         else:
-            from menu_handler import menu_handler
-            await update.message.reply_text("❌ Failed to create menu. Try again.")
-            context.user_data.pop('new_menu_name', None)
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-            return ConversationHandler.END
+            return await self._finish_to_admin_menu(
+                update, context, "❌ Failed to create menu. Try again."
+            )
     
+    @admin_only(conv=True)
     async def start_delete_menu(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start deleting a menu"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
+        _, message, query = _ctx(update)
+        if query:
+            await query.answer()
         
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_text("⛔ Access Denied!")
-            return ConversationHandler.END
+        # Deletable menus (not main or admin)
+        menu_list = self.config.deletable_menus_text
         
-        if update.callback_query:
-            await update.callback_query.answer()
-        
-        # Get deletable menus (not main or admin)
-        deletable_menus = [m for m in self.config.menus.keys() if m not in ['main', 'admin']]
-        
-        if not deletable_menus:
+        if not menu_list:
             await message.reply_text(
                 "❌ No menus available to delete!\n\n"
                 "You cannot delete 'main' or 'admin' menus."
             )
             return ConversationHandler.END
         
-        menu_list = "\n".join([f"• <code>{m}</code>" for m in deletable_menus])
-        
         await message.reply_text(
             "🗑️ <b>Delete Menu</b>\n\n"
             f"Available menus:\n{menu_list}\n\n"
@@ -1036,217 +1246,193 @@ class AdminHandler:
         )
         return WAITING_DELETE_MENU_CONFIRM
     
+    @conversation_step
     async def receive_delete_menu_confirm(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Confirm and delete the menu"""
-        from menu_handler import menu_handler
-        
         menu_name = update.message.text.strip().lower()
         
         # Check if menu exists and is deletable
         if menu_name not in self.config.menus:
-            await update.message.reply_text(
-                f"❌ Menu '<code>{menu_name}</code>' does not exist!\n\n"
-                "Try again or send /cancel to abort.",
-                parse_mode='HTML'
+            await self._reply_retry(
+                update, context,
+                f"❌ Menu '<code>{escape(menu_name)}</code>' does not exist!\n\n"
+                "Try again or send /cancel to abort."
             )
             return WAITING_DELETE_MENU_CONFIRM
         
-        if menu_name in ['main', 'admin']:
-            await update.message.reply_text(
-                f"❌ Cannot delete essential menu '<code>{menu_name}</code>'!",
-                parse_mode='HTML'
+        if menu_name in RESERVED_MENUS:
+            await self._reply_retry(
+                update, context,
+                f"❌ Cannot delete essential menu '<code>{escape(menu_name)}</code>'!"
             )
             return WAITING_DELETE_MENU_CONFIRM
         
         # Delete the menu
-        if self.config.delete_menu(menu_name):
-            await update.message.reply_text(
+        if await self.config.delete_menu(menu_name):
+            result = (
                 f"✅ <b>Menu Deleted!</b>\n\n"
-                f"Menu '<code>{menu_name}</code>' has been removed.\n\n"
-                f"💡 Button mappings pointing to this menu were also removed.",
-                parse_mode='HTML'
+                f"Menu '<code>{escape(menu_name)}</code>' has been removed.\n\n"
+                f"💡 Button mappings pointing to this menu were also removed."
             )
         else:
-            await update.message.reply_text("❌ Failed to delete menu. Try again.")
+            result = "❌ Failed to delete menu. Try again."
         
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @conversation_step
     async def receive_new_button_name(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive new button name and add it to menu"""
-        from menu_handler import menu_handler
-        
         new_button_text = update.message.text.strip()
         menu_name = context.user_data.get('editing_menu')
         
-        if menu_name in self.config.config['menus']:
+        menu = self.config.config['menus'].get(menu_name)
+        
+        if menu is not None:
             # Add button as a new row (before the last row which usually has Back/Main Menu)
-            buttons = self.config.config['menus'][menu_name]['buttons']
+            buttons = menu['buttons']
             
             # Insert before the last row (navigation buttons)
             if len(buttons) > 0:
                 buttons.insert(-1, [new_button_text])
             else:
                 buttons.append([new_button_text])
+            self.config.invalidate_button_index(menu_name)
             
-            if self.config.save_config():
-                await update.message.reply_text(
+            if await self.config.save_config_async():
+                result = (
                     f"✅ <b>Button added successfully!</b>\n\n"
-                    f"Menu: <code>{menu_name}</code>\n"
-                    f"New button: <code>{new_button_text}</code>\n\n"
+                    f"Menu: <code>{escape(menu_name)}</code>\n"
+                    f"New button: <code>{escape(new_button_text)}</code>\n\n"
                     f"💡 <b>Next Steps:</b>\n"
                     f"• Use '💬 Edit Response' to set what happens when clicked\n"
-                    f"• Or edit menu_config.json to map it to another menu",
-                    parse_mode='HTML'
+                    f"• Or edit menu_config.json to map it to another menu"
                 )
             else:
-                await update.message.reply_text("❌ Failed to add button.")
+                result = "❌ Failed to add button."
         else:
-            await update.message.reply_text(f"❌ Menu '{menu_name}' not found.")
+            result = f"❌ Menu '{escape(menu_name)}' not found."
         
-        context.user_data.pop('editing_menu', None)
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @conversation_step
     async def receive_add_to_main_choice(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive choice about adding to main menu"""
-        from menu_handler import menu_handler
-        
         choice = update.message.text.strip()
         menu_name = context.user_data.get('new_menu_name')
         
-        if "Yes" in choice or "yes" in choice or "✅" in choice:
+        if choice.lower() in _AFFIRMATIVE:
             # Ask for button text
             await update.message.reply_text(
                 f"🔘 <b>Button Text for Main Menu</b>\n\n"
                 f"Send me the text for the button that will open this menu.\n\n"
-                f"Example: <code>🛠️ {menu_name.title()}</code>\n\n"
+                f"Example: <code>🛠️ {escape(menu_name.title())}</code>\n\n"
                 f"Send /cancel to abort.",
                 parse_mode='HTML'
             )
             return WAITING_MAIN_BUTTON_TEXT
         else:
             # User chose not to add to main menu
-            await update.message.reply_text(
+            return await self._finish_to_admin_menu(
+                update, context,
                 f"✅ <b>Menu created!</b>\n\n"
-                f"Menu '<code>{menu_name}</code>' is ready.\n\n"
+                f"Menu '<code>{escape(menu_name)}</code>' is ready.\n\n"
                 f"💡 To access it, you'll need to manually:\n"
                 f"1. Add a button to another menu\n"
-                f"2. Map it in button_mapping in menu_config.json",
-                parse_mode='HTML'
+                f"2. Map it in button_mapping in menu_config.json"
             )
-            context.user_data.pop('new_menu_name', None)
-            context.user_data.pop('new_menu_title', None)
-            await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-            return ConversationHandler.END
     
+    @conversation_step
     async def receive_main_button_text(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive button text and add to main menu with mapping"""
-        from menu_handler import menu_handler
-        
         button_text = update.message.text.strip()
         menu_name = context.user_data.get('new_menu_name')
         
-        # Add button to main menu
-        if 'main' in self.config.config['menus']:
-            buttons = self.config.config['menus']['main']['buttons']
+        if not menu_name:
+            await update.message.reply_text("❌ Error: No menu selected")
+            self._clear_admin_state(context)
+            return ConversationHandler.END
+        
+        main_menu = self.config.menus.get('main')
+        
+        if main_menu is not None:
+            buttons = main_menu['buttons']
             
             # Insert before the last row (navigation buttons)
             if len(buttons) > 0:
                 buttons.insert(-1, [button_text])
             else:
                 buttons.append([button_text])
+            self.config.invalidate_button_index('main')
             
             # Add button mapping
-            if 'button_mapping' not in self.config.config:
-                self.config.config['button_mapping'] = {}
-            
-            self.config.config['button_mapping'][button_text] = menu_name
+            self.config.config.setdefault('button_mapping', {})[button_text] = menu_name
             
             # Save config
-            if self.config.save_config():
-                await update.message.reply_text(
+            if await self.config.save_config_async():
+                result = (
                     f"🎉 <b>All Done!</b>\n\n"
-                    f"✅ Menu created: <code>{menu_name}</code>\n"
-                    f"✅ Button added to main menu: <code>{button_text}</code>\n"
+                    f"✅ Menu created: <code>{escape(menu_name)}</code>\n"
+                    f"✅ Button added to main menu: <code>{escape(button_text)}</code>\n"
                     f"✅ Button mapping created\n\n"
                     f"Your new menu is now accessible from the main menu!\n\n"
                     f"💡 <b>Next Steps:</b>\n"
-                    f"• Use '🔧 Edit Menu' → '<code>{menu_name}</code>' to add more buttons\n"
-                    f"• Test it by going to main menu and tapping the new button!",
-                    parse_mode='HTML'
+                    f"• Use '🔧 Edit Menu' → '<code>{escape(menu_name)}</code>' to add more buttons\n"
+                    f"• Test it by going to main menu and tapping the new button!"
                 )
             else:
-                await update.message.reply_text("❌ Failed to save configuration.")
+                result = "❌ Failed to save configuration."
         else:
-            await update.message.reply_text("❌ Main menu not found!")
+            result = "❌ Main menu not found!"
         
-        # Cleanup
-        context.user_data.pop('new_menu_name', None)
-        context.user_data.pop('new_menu_title', None)
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
+    @admin_only(conv=True)
     async def start_edit_button_mapping(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Start editing button mappings"""
-        user_id = update.effective_user.id
-        message = update.callback_query.message if update.callback_query else update.message
-        
-        if not self.is_admin(user_id):
-            if update.callback_query:
-                await update.callback_query.answer("⛔ Access Denied", show_alert=True)
-            await message.reply_html("⛔ <b>Access Denied!</b>")
-            return ConversationHandler.END
-        
-        if update.callback_query:
-            await update.callback_query.answer()
+        _, message, query = _ctx(update)
+        if query:
+            await query.answer()
         
         # Get all button mappings
         mappings = self.config.button_mapping
         mapping_count = len(mappings)
         
         # Format mappings list
-        mapping_list = ""
-        for idx, (button_text, target) in enumerate(mappings.items(), 1):
-            mapping_list += f"{idx}. <code>{button_text}</code> → <code>{target}</code>\n"
+        mapping_list = "".join(
+            f"{idx}. <code>{escape(button_text)}</code> → <code>{escape(target)}</code>\n"
+            for idx, (button_text, target) in enumerate(mappings.items(), 1)
+        )
         
         await message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║  🔗 <b>EDIT BUTTON MAPPING</b> 🔗  ║\n"
-            "╚═══════════════════════════════╝\n\n"
+            f"{_EDIT_MAPPING_HEADER}"
             f"📊 <b>CURRENT MAPPINGS ({mapping_count}):</b>\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            f"{_SEPARATOR}\n"
             f"{mapping_list}\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            "✏️ Send the <b>button text</b> you want to remap\n"
-            "   (exact text from list above)\n\n"
-            "💡 <b>TIP:</b> Button mappings link button text\n"
-            "   to a menu name or action (main, back, admin)\n\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "Type /cancel to abort"
+            f"{_EDIT_MAPPING_FOOTER}"
         )
         return WAITING_MAPPING_BUTTON
     
+    @conversation_step
     async def receive_mapping_button(
         self,
         update: Update,
@@ -1258,23 +1444,24 @@ class AdminHandler:
         mappings = self.config.button_mapping
         
         if button_text not in mappings:
-            await update.message.reply_html(
-                f"❌ Button '<code>{button_text}</code>' not found in mappings.\n\n"
+            await self._reply_retry(
+                update, context,
+                f"❌ Button '<code>{escape(button_text)}</code>' not found in mappings.\n\n"
                 "Please send exact button text or /cancel to abort."
             )
             return WAITING_MAPPING_BUTTON
         
         # Store button being edited
-        context.user_data['mapping_button'] = button_text
+        self._set_state(context, mapping_button=button_text)
         current_target = mappings[button_text]
         
         # Get available menus
-        menu_list = "\n".join([f"  • <code>{k}</code>" for k in self.config.menus.keys()])
+        menu_list = self.config.menu_keys_text
         
         await update.message.reply_html(
             f"🔗 <b>Editing Mapping for:</b>\n"
-            f"<code>{button_text}</code>\n\n"
-            f"📍 <b>Current Target:</b> <code>{current_target}</code>\n\n"
+            f"<code>{escape(button_text)}</code>\n\n"
+            f"📍 <b>Current Target:</b> <code>{escape(current_target)}</code>\n\n"
             f"📋 <b>Available Menus:</b>\n"
             f"{menu_list}\n\n"
             f"✨ <b>Special Actions:</b>\n"
@@ -1288,41 +1475,35 @@ class AdminHandler:
         )
         return WAITING_MAPPING_TARGET
     
+    @conversation_step
     async def receive_mapping_target(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Receive new target for button mapping"""
-        from menu_handler import menu_handler
-        
         new_target = update.message.text.strip()
         button_text = context.user_data.get('mapping_button')
         
         if not button_text:
             await update.message.reply_text("❌ Error: No button selected")
+            self._clear_admin_state(context)
             return ConversationHandler.END
         
         # Update button mapping
         self.config.config['button_mapping'][button_text] = new_target
         
-        if self.config.save_config():
-            await update.message.reply_html(
-                "╔═══════════════════════════════╗\n"
-                "║    ✅ <b>SUCCESS!</b> ✅           ║\n"
-                "╚═══════════════════════════════╝\n\n"
-                f"🔗 <b>Button Mapping Updated</b>\n\n"
-                f"📝 Button: <code>{button_text}</code>\n"
-                f"🎯 New Target: <code>{new_target}</code>\n\n"
+        if await self.config.save_config_async():
+            result = (
+                f"{_MAPPING_UPDATED_HEADER}"
+                f"📝 Button: <code>{escape(button_text)}</code>\n"
+                f"🎯 New Target: <code>{escape(new_target)}</code>\n\n"
                 f"✨ Changes saved successfully!"
             )
         else:
-            await update.message.reply_text("❌ Failed to save configuration.")
+            result = "❌ Failed to save configuration."
         
-        # Cleanup
-        context.user_data.pop('mapping_button', None)
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, result)
     
     async def cancel_conversation(
         self,
@@ -1330,30 +1511,7 @@ class AdminHandler:
         context: ContextTypes.DEFAULT_TYPE
     ) -> int:
         """Cancel ongoing conversation"""
-        from menu_handler import menu_handler
-        
-        await update.message.reply_html(
-            "╔═══════════════════════════════╗\n"
-            "║    ❌ <b>CANCELLED</b> ❌          ║\n"
-            "╚═══════════════════════════════╝\n\n"
-            "🔙 Operation cancelled.\n"
-            "No changes were made."
-        )
-        await menu_handler.show_menu(update, context, 'admin', add_to_history=False)
-        
-        # Clean up user data
-        context.user_data.pop('editing_button', None)
-        context.user_data.pop('removing_admin', None)
-        context.user_data.pop('adding_admin', None)
-        context.user_data.pop('editing_menu', None)
-        context.user_data.pop('button_to_edit', None)
-        context.user_data.pop('button_row', None)
-        context.user_data.pop('button_col', None)
-        context.user_data.pop('new_menu_name', None)
-        context.user_data.pop('removing_button', None)
-        context.user_data.pop('mapping_button', None)
-        
-        return ConversationHandler.END
+        return await self._finish_to_admin_menu(update, context, _CANCELLED_HTML)
 
 
 # Global admin handler instance
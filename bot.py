@@ -1,11 +1,15 @@
 """
 Main Telegram Bot Entry Point
-Initializes and runs the bot with polling
+Initializes and runs the bot with polling or a webhook
 """
 import logging
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Optional
 from telegram import Update, BotCommand, MenuButtonCommands
 from telegram.ext import (
+    AIORateLimiter,
     Application,
+    BaseUpdateProcessor,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
@@ -13,7 +17,7 @@ from telegram.ext import (
     filters,
     ContextTypes
 )
-from settings import config, BOT_NAME
+from settings import config, BOT_NAME, MAX_CONCURRENT_UPDATES
 from menu_handler import menu_handler
 from admin_handler import (
     admin_handler,
@@ -43,6 +47,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The only update types the handlers below react to; Telegram doesn't
+# send the rest at all
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates concurrently, but one at a time per user
+    
+    The first update from a user runs right away and then works through
+    anything that user sent meanwhile. Later updates only join that queue
+    and give their concurrency slot back, so a user flooding the bot holds
+    a single slot and can't hold up everyone else. A user's own updates
+    keep their order, so conversation state and navigation history see
+    the same sequence as with sequential processing.
+    """
+    
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # user_id -> updates waiting for that user's running update
+        self._user_queues: Dict[int, Deque[Awaitable[Any]]] = {}
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            await coroutine
+            return
+        
+        queue = self._user_queues.get(user.id)
+        if queue is not None:
+            # Already being worked on: the running update picks this up
+            queue.append(coroutine)
+            return
+        
+        queue = self._user_queues[user.id] = deque((coroutine,))
+        try:
+            while queue:
+                try:
+                    await queue[0]
+                except Exception:
+                    logger.exception("Error while processing an update")
+                finally:
+                    queue.popleft()
+        finally:
+            del self._user_queues[user.id]
+            if queue:
+                # Cancelled (shutdown) with updates still waiting
+                logger.warning(f"Dropping {len(queue)} queued update(s) for user {user.id}")
+                for pending in queue:
+                    pending.close()
+    
+    async def initialize(self) -> None:
+        """Nothing to set up"""
+    
+    async def shutdown(self) -> None:
+        """Nothing to tear down"""
+
+
+def build_rate_limiter() -> Optional[AIORateLimiter]:
+    """
+    Pace outbound Bot API calls to Telegram's flood limits
+    
+    Keeps bursts of button presses under the global (30/s) and per-chat
+    limits instead of running into 429 errors and retry backoff. Needs
+    the rate-limiter extra; without it calls are sent unthrottled.
+    """
+    try:
+        return AIORateLimiter(overall_max_rate=30, overall_time_period=1, max_retries=2)
+    except RuntimeError:
+        logger.warning(
+            "Rate limiting disabled: install \"python-telegram-bot[rate-limiter]\" to enable it"
+        )
+        return None
+
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
@@ -84,9 +162,22 @@ async def post_init(application: Application) -> None:
     await application.bot.set_chat_menu_button(menu_button=MenuButtonCommands())
     logger.info("Menu button enabled")
     
+    # Evict admin conversation state that users abandoned mid-flow
+    admin_handler.start_state_sweeper(application)
+    
     logger.info("Bot is ready to receive messages!")
 
 
+async def post_shutdown(application: Application) -> None:
+    """
+    Called when the bot shuts down
+    Stops background tasks and writes any config edits still
+    waiting in the save queue
+    """
+    admin_handler.stop_state_sweeper()
+    await config.writer.flush()
+
+
 def main() -> None:
     """
     Main function to start the bot
@@ -94,11 +185,22 @@ def main() -> None:
     try:
         # Create the Application
         logger.info(f"Initializing {BOT_NAME}...")
+        builder = Application.builder()
+        rate_limiter = build_rate_limiter()
+        if rate_limiter is not None:
+            builder.rate_limiter(rate_limiter)
         # Disable job_queue for Python 3.13 compatibility
         application = (
-            Application.builder()
+            builder
             .token(config.bot_token)
             .post_init(post_init)
+            .post_shutdown(post_shutdown)
+            .concurrent_updates(PerUserUpdateProcessor(MAX_CONCURRENT_UPDATES))
+            # One pooled keep-alive connection per concurrently processed
+            # update, with room to wait for a free one during bursts
+            .connection_pool_size(MAX_CONCURRENT_UPDATES)
+            .pool_timeout(5.0)
+            .connect_timeout(5.0)
             .job_queue(None)
             .build()
         )
@@ -114,7 +216,7 @@ def main() -> None:
         # Edit Welcome Message conversation
         welcome_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^📝 Edit Welcome Message$"), admin_handler.start_edit_welcome),
+                MessageHandler(filters.Text(["📝 Edit Welcome Message"]), admin_handler.start_edit_welcome),
                 CallbackQueryHandler(admin_handler.start_edit_welcome, pattern="^btn:📝 Edit Welcome Message$")
             ],
             states={
@@ -131,7 +233,7 @@ def main() -> None:
         # Edit Response conversation
         response_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^💬 Edit Response$"), admin_handler.start_edit_response),
+                MessageHandler(filters.Text(["💬 Edit Response"]), admin_handler.start_edit_response),
                 CallbackQueryHandler(admin_handler.start_edit_response, pattern="^btn:💬 Edit Response$")
             ],
             states={
@@ -151,7 +253,7 @@ def main() -> None:
         # Add Admin conversation
         add_admin_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^➕ Add Admin$"), admin_handler.start_add_admin),
+                MessageHandler(filters.Text(["➕ Add Admin"]), admin_handler.start_add_admin),
                 CallbackQueryHandler(admin_handler.start_add_admin, pattern="^btn:➕ Add Admin$")
             ],
             states={
@@ -168,7 +270,7 @@ def main() -> None:
         # Remove Admin conversation
         remove_admin_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^➖ Remove Admin$"), admin_handler.start_remove_admin),
+                MessageHandler(filters.Text(["➖ Remove Admin"]), admin_handler.start_remove_admin),
                 CallbackQueryHandler(admin_handler.start_remove_admin, pattern="^btn:➖ Remove Admin$")
             ],
             states={
@@ -185,7 +287,7 @@ def main() -> None:
         # Edit Menu conversation
         edit_menu_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^🔧 Edit Menu$"), admin_handler.start_edit_menu),
+                MessageHandler(filters.Text(["🔧 Edit Menu"]), admin_handler.start_edit_menu),
                 CallbackQueryHandler(admin_handler.start_edit_menu, pattern="^btn:🔧 Edit Menu$")
             ],
             states={
@@ -217,7 +319,7 @@ def main() -> None:
         # Add Menu conversation
         add_menu_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^➕ Add Menu$"), admin_handler.start_add_menu),
+                MessageHandler(filters.Text(["➕ Add Menu"]), admin_handler.start_add_menu),
                 CallbackQueryHandler(admin_handler.start_add_menu, pattern="^btn:➕ Add Menu$")
             ],
             states={
@@ -243,7 +345,7 @@ def main() -> None:
         # Delete Menu conversation
         delete_menu_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^🗑️ Delete Menu$"), admin_handler.start_delete_menu),
+                MessageHandler(filters.Text(["🗑️ Delete Menu"]), admin_handler.start_delete_menu),
                 CallbackQueryHandler(admin_handler.start_delete_menu, pattern="^btn:🗑️ Delete Menu$")
             ],
             states={
@@ -260,7 +362,7 @@ def main() -> None:
         # Edit Button Mapping conversation
         button_mapping_conv = ConversationHandler(
             entry_points=[
-                MessageHandler(filters.Regex("^🔗 Edit Button Mapping$"), admin_handler.start_edit_button_mapping),
+                MessageHandler(filters.Text(["🔗 Edit Button Mapping"]), admin_handler.start_edit_button_mapping),
                 CallbackQueryHandler(admin_handler.start_edit_button_mapping, pattern="^btn:🔗 Edit Button Mapping$")
             ],
             states={
@@ -294,12 +396,29 @@ def main() -> None:
         # Register error handler
         application.add_error_handler(error_handler)
         
-        # Start the bot with polling
-        logger.info("Starting polling...")
-        application.run_polling(
-            allowed_updates=Update.ALL_TYPES,
-            drop_pending_updates=True
-        )
+        if config.webhook_url:
+            # Let Telegram push updates to us instead of polling for them
+            url_path = config.bot_token
+            logger.info(f"Starting webhook on {config.webhook_listen}:{config.webhook_port}...")
+            application.run_webhook(
+                listen=config.webhook_listen,
+                port=config.webhook_port,
+                url_path=url_path,
+                webhook_url=f"{config.webhook_url.rstrip('/')}/{url_path}",
+                secret_token=config.webhook_secret,
+                allowed_updates=ALLOWED_UPDATES,
+                drop_pending_updates=True
+            )
+        else:
+            # No public endpoint configured: long-poll, so updates arrive
+            # as soon as Telegram has them
+            logger.info("Starting polling...")
+            application.run_polling(
+                poll_interval=0.0,
+                timeout=30,
+                allowed_updates=ALLOWED_UPDATES,
+                drop_pending_updates=True
+            )
         
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
@@ -0,0 +1,129 @@
+"""
+Navigation History Module
+Stores each user's menu trail for the back button, in process memory
+or in Redis when several bot processes share the load
+"""
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Protocol
+from settings import config, MENU_HISTORY_MAX_USERS, MENU_HISTORY_DEPTH
+import logging
+import sys
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: only needed when redis_url is configured
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryStore(Protocol):
+    """Per-user menu trail used by the back button"""
+    
+    async def push(self, user_id: int, menu_name: str) -> None:
+        """Add menu to user's navigation history"""
+    
+    async def pop_previous(self, user_id: int) -> Optional[str]:
+        """Drop the current menu and return the one before it, if any"""
+    
+    async def clear(self, user_id: int) -> None:
+        """Clear user's navigation history"""
+
+
+class InMemoryHistoryStore:
+    """Navigation history kept in this process (lost on restart)"""
+    
+    __slots__ = ('max_users', 'depth', 'user_history')
+    
+    def __init__(self, max_users: int = MENU_HISTORY_MAX_USERS, depth: int = MENU_HISTORY_DEPTH):
+        self.max_users = max_users
+        self.depth = depth
+        # Least recently active users first so the oldest can be evicted
+        self.user_history: 'OrderedDict[int, Deque[str]]' = OrderedDict()
+    
+    async def push(self, user_id: int, menu_name: str) -> None:
+        """Add menu to user's navigation history"""
+        history = self.user_history.get(user_id)
+        if history is None:
+            history = self.user_history[user_id] = deque(maxlen=self.depth)
+            if len(self.user_history) > self.max_users:
+                self.user_history.popitem(last=False)
+        else:
+            self.user_history.move_to_end(user_id)
+        # Every user's trail holds the same few menu names, so share
+        # one string object per name
+        history.append(sys.intern(menu_name))
+    
+    async def pop_previous(self, user_id: int) -> Optional[str]:
+        """Drop the current menu and return the one before it, if any"""
+        history = self.user_history.get(user_id)
+        if history is None or len(history) < 2:
+            return None
+        
+        # Remove current menu
+        history.pop()
+        return history[-1]
+    
+    async def clear(self, user_id: int) -> None:
+        """Clear user's navigation history"""
+        history = self.user_history.get(user_id)
+        if history is not None:
+            history.clear()
+
+
+class RedisHistoryStore:
+    """
+    Navigation history kept in Redis, shared by every bot process
+    
+    Each user's trail is a capped list at hist:{user_id}, newest menu
+    first, that expires after a day without navigation.
+    """
+    
+    # Pop the current menu and read the previous one in a single round trip
+    _POP_PREVIOUS_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) < 2 then
+    return false
+end
+redis.call('LPOP', KEYS[1])
+return redis.call('LINDEX', KEYS[1], 0)
+"""
+
+    def __init__(self, url: str, depth: int = MENU_HISTORY_DEPTH, ttl: int = 86400):
+        if aioredis is None:
+            raise RuntimeError(
+                "'redis_url' is set in menu_config.json but the redis package "
+                "is not installed (pip install redis)"
+            )
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.depth = depth
+        self.ttl = ttl
+        self._pop_previous = self.redis.register_script(self._POP_PREVIOUS_SCRIPT)
+    
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"hist:{user_id}"
+    
+    async def push(self, user_id: int, menu_name: str) -> None:
+        """Add menu to user's navigation history"""
+        key = self._key(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, menu_name)
+            pipe.ltrim(key, 0, self.depth - 1)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+    
+    async def pop_previous(self, user_id: int) -> Optional[str]:
+        """Drop the current menu and return the one before it, if any"""
+        return await self._pop_previous(keys=[self._key(user_id)])
+    
+    async def clear(self, user_id: int) -> None:
+        """Clear user's navigation history"""
+        await self.redis.delete(self._key(user_id))
+
+
+def create_history_store() -> HistoryStore:
+    """Build the history store selected by the configuration"""
+    if config.redis_url:
+        logger.info("Navigation history stored in Redis")
+        return RedisHistoryStore(config.redis_url)
+    return InMemoryHistoryStore()
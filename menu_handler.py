@@ -2,28 +2,92 @@
 Menu Handler Module
 Manages menu navigation and button interactions
 """
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from telegram import Message, Update, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from telegram.constants import ChatAction, MessageLimit
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
-from typing import List, Dict, Any
-from settings import config
+from typing import Dict, Any, Optional, Tuple
+from settings import config, BUTTON_DEBOUNCE_MS
+from admin_handler import admin_handler, _StaticInlineKeyboard, _StaticReplyKeyboard
+from history import HistoryStore, create_history_store
+from itertools import chain
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Admin panel buttons handled outside of any conversation
+ADMIN_ACTION_BUTTONS = frozenset((
+    "👥 Manage Admins", "🔄 Reload Config",
+    "➕ Add Menu", "🗑️ Delete Menu", "🔙 Back to Settings"
+))
+
+# button_mapping targets with special meaning rather than a menu name
+_NAV_ACTIONS = frozenset(('back', 'main', 'admin'))
+# Dispatch entry for buttons the configuration doesn't know
+_NO_ACTION = ('default', None)
+
 
 class MenuHandler:
     """Handles menu creation and navigation"""
     
+    __slots__ = (
+        'config', 'history', '_last_presses',
+        '_keyboards', '_reply_keyboards', '_titles', '_keyboards_revision',
+        '_dispatch', '_dispatch_revision'
+    )
+    
     def __init__(self):
         self.config = config
         # Track user navigation history for back button functionality
-        self.user_history: Dict[int, List[str]] = {}
+        self.history: HistoryStore = create_history_store()
+        # Last handled button press per chat as (text, loop time), for debouncing
+        self._last_presses: Dict[int, Tuple[str, float]] = {}
+        # Rendered inline keyboards keyed by (menu_name, with_settings),
+        # valid for the config revision they were built from
+        self._keyboards: Dict[Tuple[str, bool], InlineKeyboardMarkup] = {}
+        # Main reply keyboards keyed by whether the Settings row is shown
+        self._reply_keyboards: Dict[bool, ReplyKeyboardMarkup] = {}
+        # Menu titles by menu name, with the parse mode they need
+        self._titles: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._keyboards_revision = -1
+        # Button dispatch table, see _get_dispatch
+        self._dispatch: Dict[str, Tuple[str, Any]] = {}
+        self._dispatch_revision = -1
+    
+    def _check_render_cache(self) -> None:
+        """Drop cached keyboards and titles built from an older config revision"""
+        revision = self.config.revision
+        if self._keyboards_revision != revision:
+            self._keyboards.clear()
+            self._reply_keyboards.clear()
+            self._titles.clear()
+            self._keyboards_revision = revision
+    
+    def _get_dispatch(self) -> Dict[str, Tuple[str, Any]]:
+        """
+        Get {button_text: (kind, payload)} for every button the bot knows
+        
+        Built once per config revision, so a press costs a single lookup.
+        Admin action buttons win over mappings, and mappings over custom
+        responses, matching the order the handlers used to check them in.
+        """
+        revision = self.config.revision
+        if self._dispatch_revision != revision:
+            dispatch = {text: ('response', response) for text, response in self.config.responses.items()}
+            for text, action in self.config.button_mapping.items():
+                dispatch[text] = (action, None) if action in _NAV_ACTIONS else ('menu', action)
+            for text in ADMIN_ACTION_BUTTONS:
+                dispatch[text] = ('admin_action', None)
+            self._dispatch = dispatch
+            self._dispatch_revision = revision
+        return self._dispatch
     
     def create_main_reply_keyboard(self, user_id: int = None) -> ReplyKeyboardMarkup:
         """
         Create a persistent reply keyboard for the main menu
         This keyboard stays at the bottom for quick access
-        Displays in 2-column layout
+        Displays in 2-column layout, cached until the config changes
         
         Args:
             user_id: User ID to check for admin status
@@ -31,48 +95,48 @@ class MenuHandler:
         Returns:
             ReplyKeyboardMarkup object
         """
-        from admin_handler import admin_handler
+        with_settings = bool(user_id) and user_id in self.config.admin_id_set
+        self._check_render_cache()
+        reply_markup = self._reply_keyboards.get(with_settings)
+        if reply_markup is not None:
+            return reply_markup
         
         # Get main menu buttons (they are in 1 column in config)
         menu_data = self.config.get_menu('main')
         buttons = menu_data.get('buttons', [])
         
         # Flatten the buttons list
-        flat_buttons = []
-        for row in buttons:
-            flat_buttons.extend(row)
+        flat_buttons = list(chain.from_iterable(buttons))
         
         # Arrange in 2 columns:
         # Row 1: "What is UTGL?" (full width)
         # Row 2: "Trust Plans & Benefits" | "How to Apply"
         # Row 3: "Collaboration Opportunities" | "Other Enquiries"
-        keyboard = []
-        
-        if len(flat_buttons) > 0:
-            # First button full width
-            keyboard.append([KeyboardButton(flat_buttons[0])])
-            
-            # Remaining buttons in pairs of 2
-            for i in range(1, len(flat_buttons), 2):
-                if i + 1 < len(flat_buttons):
-                    keyboard.append([KeyboardButton(flat_buttons[i]), KeyboardButton(flat_buttons[i + 1])])
-                else:
-                    keyboard.append([KeyboardButton(flat_buttons[i])])
+        rows = []
+        if flat_buttons:
+            # First button full width, remaining buttons in pairs of 2
+            rows = [flat_buttons[:1]] + [flat_buttons[i:i + 2] for i in range(1, len(flat_buttons), 2)]
+        keyboard = [[KeyboardButton(text) for text in row] for row in rows]
         
         # Add Settings button for admins (full width at bottom)
-        if user_id and admin_handler.is_admin(user_id):
+        if with_settings:
             keyboard.append([KeyboardButton("⚙️ Settings")])
         
-        return ReplyKeyboardMarkup(
+        reply_markup = self._reply_keyboards[with_settings] = _StaticReplyKeyboard(
             keyboard,
             resize_keyboard=True,
             one_time_keyboard=False  # Keep keyboard visible
         )
+        return reply_markup
     
     def create_keyboard(self, menu_name: str, user_id: int = None) -> InlineKeyboardMarkup:
         """
         Create an InlineKeyboardMarkup from menu configuration
         
+        Keyboards are cached until the configuration changes, so redrawing
+        a menu (e.g. the admin panel after every admin action) skips the
+        rebuild.
+        
         Args:
             menu_name: Name of the menu in menu_config.json
             user_id: User ID to check for admin status
@@ -80,75 +144,78 @@ class MenuHandler:
         Returns:
             InlineKeyboardMarkup object
         """
-        from admin_handler import admin_handler
+        with_settings = menu_name == 'main' and bool(user_id) and user_id in self.config.admin_id_set
+        self._check_render_cache()
+        key = (menu_name, with_settings)
+        reply_markup = self._keyboards.get(key)
+        if reply_markup is not None:
+            return reply_markup
         
         menu_data = self.config.get_menu(menu_name)
         
         if not menu_data:
-            logger.error(f"Menu '{menu_name}' not found in configuration")
+            logger.error("Menu '%s' not found in configuration", menu_name)
             # Return default main menu
             menu_data = self.config.get_menu('main')
         
         buttons = menu_data.get('buttons', [])
         
         # Add Settings button to main menu for admins
-        if menu_name == 'main' and user_id and admin_handler.is_admin(user_id):
-            # Check if settings button already exists
-            has_settings = any("⚙️ Settings" in str(row) for row in buttons)
-            if not has_settings:
+        if with_settings:
+            # Check if settings button already exists (one lookup in the
+            # main menu's button index)
+            if "⚙️ Settings" not in self.config.button_index('main'):
                 buttons = buttons + [["⚙️ Settings"]]
         
-        # Create inline keyboard buttons with callback_data
-        keyboard = []
-        for row in buttons:
-            keyboard_row = []
-            for button_text in row:
-                # Use button text as callback data
-                keyboard_row.append(InlineKeyboardButton(button_text, callback_data=f"btn:{button_text}"))
-            keyboard.append(keyboard_row)
+        # Create inline keyboard buttons, using button text as callback data
+        keyboard = [
+            [InlineKeyboardButton(button_text, callback_data=f"btn:{button_text}") for button_text in row]
+            for row in buttons
+        ]
         
         # Create InlineKeyboardMarkup
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self._keyboards[key] = _StaticInlineKeyboard(keyboard)
         
         return reply_markup
     
     def get_menu_title(self, menu_name: str) -> str:
         """Get the title/message for a menu"""
-        menu_data = self.config.get_menu(menu_name)
-        return menu_data.get('title', 'Menu')
+        return self._menu_title(menu_name)[0]
     
-    def add_to_history(self, user_id: int, menu_name: str) -> None:
+    def _menu_title(self, menu_name: str) -> Tuple[str, Optional[str]]:
+        """
+        Get a menu's title and its parse mode (cached until the config changes)
+        
+        Titles without markup or entities are sent without a parse mode,
+        so Telegram doesn't have to parse them as HTML.
+        """
+        self._check_render_cache()
+        entry = self._titles.get(menu_name)
+        if entry is None:
+            title = self.config.get_menu(menu_name).get('title', 'Menu')
+            parse_mode = 'HTML' if '<' in title or '&' in title else None
+            entry = self._titles[menu_name] = (title, parse_mode)
+        return entry
+    
+    async def add_to_history(self, user_id: int, menu_name: str) -> None:
         """Add menu to user's navigation history"""
-        if user_id not in self.user_history:
-            self.user_history[user_id] = []
-        self.user_history[user_id].append(menu_name)
+        await self.history.push(user_id, menu_name)
     
-    def get_previous_menu(self, user_id: int) -> str:
+    async def get_previous_menu(self, user_id: int) -> str:
         """Get previous menu from user's history"""
-        if user_id not in self.user_history or len(self.user_history[user_id]) < 2:
-            return 'main'
-        
-        # Remove current menu
-        self.user_history[user_id].pop()
-        
-        # Get previous menu
-        if self.user_history[user_id]:
-            previous = self.user_history[user_id][-1]
-            return previous
-        
-        return 'main'
+        return await self.history.pop_previous(user_id) or 'main'
     
-    def clear_history(self, user_id: int) -> None:
+    async def clear_history(self, user_id: int) -> None:
         """Clear user's navigation history"""
-        if user_id in self.user_history:
-            self.user_history[user_id] = []
+        await self.history.clear(user_id)
     
     async def show_menu(
         self,
         update: Update,
         context: ContextTypes.DEFAULT_TYPE,
         menu_name: str = 'main',
-        add_to_history: bool = True
+        add_to_history: bool = True,
+        prefix_html: str = ''
     ) -> None:
         """
         Display a menu to the user
@@ -158,16 +225,27 @@ class MenuHandler:
             context: Telegram context object
             menu_name: Name of the menu to display
             add_to_history: Whether to add this menu to navigation history
+            prefix_html: HTML shown above the menu title in the same message,
+                         e.g. the result of the action that led here
         """
         user_id = update.effective_user.id
         
         # Add to navigation history
         if add_to_history:
-            self.add_to_history(user_id, menu_name)
+            await self.add_to_history(user_id, menu_name)
         
         # Get menu keyboard and title (pass user_id for admin check)
         keyboard = self.create_keyboard(menu_name, user_id)
-        title = self.get_menu_title(menu_name)
+        title, parse_mode = self._menu_title(menu_name)
+        
+        if prefix_html:
+            combined = f"{prefix_html}\n\n{title}"
+            if len(combined) <= MessageLimit.MAX_TEXT_LENGTH:
+                title = combined
+                parse_mode = 'HTML'
+            else:
+                # Too long for one message, send the prefix on its own
+                await update.effective_message.reply_html(prefix_html)
         
         # Check if this is from a callback query or a message
         if update.callback_query:
@@ -175,16 +253,34 @@ class MenuHandler:
             await update.callback_query.edit_message_text(
                 title,
                 reply_markup=keyboard,
-                parse_mode='HTML'
+                parse_mode=parse_mode
             )
         else:
             # Send new message with inline keyboard
-            await update.message.reply_html(
+            await update.message.reply_text(
                 title,
-                reply_markup=keyboard
+                reply_markup=keyboard,
+                parse_mode=parse_mode
             )
         
-        logger.info(f"User {user_id} navigated to menu: {menu_name}")
+        logger.info("User %s navigated to menu: %s", user_id, menu_name)
+    
+    def _is_repeat_press(self, chat_id: int, button_text: str) -> bool:
+        """Record a press and tell whether it repeats the chat's last one within the debounce window"""
+        now = asyncio.get_running_loop().time()
+        window = BUTTON_DEBOUNCE_MS / 1000
+        last = self._last_presses.get(chat_id)
+        if last is not None and last[0] == button_text and now - last[1] < window:
+            return True
+        
+        presses = self._last_presses
+        if len(presses) >= 1024 and last is None:
+            # Entries only matter inside the window; drop the stale ones
+            self._last_presses = presses = {
+                chat: press for chat, press in presses.items() if now - press[1] < window
+            }
+        presses[chat_id] = (button_text, now)
+        return False
     
     async def handle_button_press(
         self,
@@ -194,68 +290,98 @@ class MenuHandler:
         """
         Handle button press from user
         
+        With BUTTON_DEBOUNCE_MS set, a press of the same button in the same
+        chat within that window of the last handled one is dropped, so
+        accidental double taps don't render the same menu twice.
+        
         Args:
             update: Telegram update object
             context: Telegram context object
         """
-        from admin_handler import admin_handler
-        
         user_id = update.effective_user.id
         button_text = update.message.text
         
-        logger.info(f"User {user_id} pressed button: {button_text}")
+        if BUTTON_DEBOUNCE_MS > 0 and self._is_repeat_press(update.effective_chat.id, button_text):
+            logger.debug("Ignoring repeated press of %s by user %s", button_text, user_id)
+            return
+        
+        logger.info("User %s pressed button: %s", user_id, button_text)
         
-        # Check if this is an admin non-conversation button
-        admin_action_buttons = [
-            "👥 Manage Admins", "🔄 Reload Config",
-            "➕ Add Menu", "🗑️ Delete Menu", "🔙 Back to Settings"
-        ]
+        await self._dispatch_button(update, context, button_text, update.message, html=False)
+    
+    async def _dispatch_button(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+        button_text: str,
+        message: Message,
+        html: bool
+    ) -> None:
+        """
+        Act on a pressed button, from the reply keyboard or an inline one
         
-        if button_text in admin_action_buttons:
+        Args:
+            update: Telegram update object
+            context: Telegram context object
+            button_text: Text of the pressed button
+            message: Message to reply to with custom or default responses
+            html: Send custom responses as HTML (inline presses) rather
+                than plain text (reply keyboard presses)
+        """
+        user_id = update.effective_user.id
+        
+        # One lookup decides what the button does
+        kind, payload = self._get_dispatch().get(button_text, _NO_ACTION)
+        
+        if kind == 'admin_action':
+            # Admin non-conversation button
             await admin_handler.handle_admin_action(update, context)
             return
         
-        # Check if button is mapped to a menu
-        button_mapping = self.config.button_mapping
+        elif kind == 'back':
+            # Navigate back
+            previous_menu = await self.get_previous_menu(user_id)
+            await self.show_menu(update, context, previous_menu, add_to_history=False)
+            return
         
-        if button_text in button_mapping:
-            action = button_mapping[button_text]
-            
-            # Handle special actions
-            if action == 'back':
-                # Navigate back
-                previous_menu = self.get_previous_menu(user_id)
-                await self.show_menu(update, context, previous_menu, add_to_history=False)
-                return
-            
-            elif action == 'main':
-                # Go to main menu
-                self.clear_history(user_id)
-                await self.show_menu(update, context, 'main')
-                return
-            
-            elif action == 'admin':
-                # Show admin menu (with auth check)
-                await admin_handler.show_admin_menu(update, context)
-                return
-            
+        elif kind == 'main':
+            # Go to main menu
+            await self.clear_history(user_id)
+            await self.show_menu(update, context, 'main')
+            return
+        
+        elif kind == 'admin':
+            # Show admin menu (with auth check)
+            await admin_handler.show_admin_menu(update, context)
+            return
+        
+        elif kind == 'menu':
+            # Navigate to submenu
+            await self.show_menu(update, context, payload)
+            return
+        
+        elif kind == 'response':
+            # Show "typing…" first, so the response (which clears it)
+            # always arrives after it
+            await self._send_typing(message)
+            # Send custom response as a new message
+            if html:
+                await message.reply_html(payload)
             else:
-                # Navigate to submenu
-                await self.show_menu(update, context, action)
-                return
-        
-        # Check if button has a custom response
-        responses = self.config.responses
-        if button_text in responses:
-            response_text = responses[button_text]
-            await update.message.reply_text(response_text)
-            logger.info(f"Sent custom response for button: {button_text}")
+                await message.reply_text(payload)
+            logger.info("Sent custom response for button: %s", button_text)
             return
         
         # Default response for unmapped buttons
-        await update.message.reply_text(
-            f"You selected: {button_text}"
-        )
+        await message.reply_text(f"You selected: {button_text}")
+    
+    @staticmethod
+    async def _send_typing(message: Message) -> None:
+        """Best-effort typing indicator; failures are only logged"""
+        try:
+            await message.chat.send_action(ChatAction.TYPING)
+        except TelegramError as e:
+            logger.debug("Could not send typing action: %s", e)
     
     async def handle_callback_query(
         self,
@@ -269,8 +395,6 @@ class MenuHandler:
             update: Telegram update object
             context: Telegram context object
         """
-        from admin_handler import admin_handler
-        
         query = update.callback_query
         await query.answer()  # Answer callback query
         
@@ -283,58 +407,9 @@ class MenuHandler:
         else:
             button_text = callback_data
         
-        logger.info(f"User {user_id} pressed inline button: {button_text}")
-        
-        # Check if this is an admin non-conversation button
-        admin_action_buttons = [
-            "👥 Manage Admins", "🔄 Reload Config",
-            "➕ Add Menu", "🗑️ Delete Menu", "🔙 Back to Settings"
-        ]
-        
-        if button_text in admin_action_buttons:
-            await admin_handler.handle_admin_action(update, context)
-            return
-        
-        # Check if button is mapped to a menu
-        button_mapping = self.config.button_mapping
-        
-        if button_text in button_mapping:
-            action = button_mapping[button_text]
-            
-            # Handle special actions
-            if action == 'back':
-                # Navigate back
-                previous_menu = self.get_previous_menu(user_id)
-                await self.show_menu(update, context, previous_menu, add_to_history=False)
-                return
-            
-            elif action == 'main':
-                # Go to main menu
-                self.clear_history(user_id)
-                await self.show_menu(update, context, 'main')
-                return
-            
-            elif action == 'admin':
-                # Show admin menu (with auth check)
-                await admin_handler.show_admin_menu(update, context)
-                return
-            
-            else:
-                # Navigate to submenu
-                await self.show_menu(update, context, action)
-                return
-        
-        # Check if button has a custom response
-        responses = self.config.responses
-        if button_text in responses:
-            response_text = responses[button_text]
-            # Send response as a new message
-            await query.message.reply_html(response_text)
-            logger.info(f"Sent custom response for button: {button_text}")
-            return
+        logger.info("User %s pressed inline button: %s", user_id, button_text)
         
-        # Default response for unmapped buttons
-        await query.message.reply_text(f"You selected: {button_text}")
+        await self._dispatch_button(update, context, button_text, query.message, html=True)
     
     async def handle_start(
         self,
@@ -351,25 +426,27 @@ class MenuHandler:
         user_id = update.effective_user.id
         user_name = update.effective_user.first_name
         
-        logger.info(f"User {user_id} ({user_name}) started the bot")
-        
-        # Clear navigation history
-        self.clear_history(user_id)
+        logger.info("User %s (%s) started the bot", user_id, user_name)
         
         # Create persistent reply keyboard
         reply_keyboard = self.create_main_reply_keyboard(user_id)
         
-        # Send welcome message with persistent keyboard
+        # Send welcome message with persistent keyboard while the
+        # navigation history is cleared
         welcome_text = (
             f"👋 Hello <b>{user_name}</b>!\n\n"
             f"{self.config.welcome_message}"
         )
-        await update.message.reply_html(
-            welcome_text,
-            reply_markup=reply_keyboard
+        await asyncio.gather(
+            self.clear_history(user_id),
+            update.message.reply_html(
+                welcome_text,
+                reply_markup=reply_keyboard
+            )
         )
         
-        # Show main menu with inline buttons
+        # Show main menu with inline buttons (after the welcome, so the
+        # two messages always arrive in this order)
         await self.show_menu(update, context, 'main')
     
     async def handle_help(
@@ -412,7 +489,7 @@ class MenuHandler:
             context: Telegram context object
         """
         user_id = update.effective_user.id
-        self.clear_history(user_id)
+        await self.clear_history(user_id)
         await self.show_menu(update, context, 'main')
 
 
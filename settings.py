@@ -2,54 +2,347 @@
 Settings module for Telegram Bot
 Loads configuration from menu_config.json
 """
+import asyncio
 import json
 import os
 import logging
-from typing import Dict, Any
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster config serialization
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait before flushing coalesced admin edits to disk
+ADMIN_CONFIG_FLUSH_INTERVAL = float(os.environ.get('ADMIN_CONFIG_FLUSH_INTERVAL', '0.5'))
+
+# Seconds before an abandoned admin conversation's user_data is evicted
+ADMIN_STATE_TTL = float(os.environ.get('ADMIN_STATE_TTL', '1800'))
+ADMIN_STATE_SWEEP_INTERVAL = float(os.environ.get('ADMIN_STATE_SWEEP_INTERVAL', '300'))
+
+# Navigation history kept for the back button: menus remembered per user,
+# and how many users are tracked before the least recently active is dropped
+MENU_HISTORY_DEPTH = int(os.environ.get('MENU_HISTORY_DEPTH', '16'))
+MENU_HISTORY_MAX_USERS = int(os.environ.get('MENU_HISTORY_MAX_USERS', '10000'))
+
+# Updates handled at once (updates from the same user still run in order)
+MAX_CONCURRENT_UPDATES = int(os.environ.get('MAX_CONCURRENT_UPDATES', '256'))
+
+# Window in milliseconds within which a repeated press of the same button in
+# a chat is ignored (0 disables debouncing)
+BUTTON_DEBOUNCE_MS = float(os.environ.get('BUTTON_DEBOUNCE_MS', '0'))
+
+# Menus the admin panel depends on, which can never be deleted
+RESERVED_MENUS = frozenset(('main', 'admin'))
+
+# Single worker thread for config file I/O: keeps it off the event loop and
+# preserves the order of reads and writes without explicit locking
+_config_io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-io")
+
+
+async def run_config_io(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking config I/O call on the config I/O thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_config_io_executor, func, *args)
+
+
+class ConfigWriter:
+    """Coalesces bursts of config edits into a single background write"""
+    
+    # Longest wait between retries after failed writes
+    MAX_RETRY_DELAY = 60.0
+    
+    def __init__(self, config: 'Config', flush_interval: float = ADMIN_CONFIG_FLUSH_INTERVAL):
+        self.config = config
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional['asyncio.Task[None]'] = None
+        # Saves waiting for the next write, resolved with its outcome
+        self._waiters: List['asyncio.Future[bool]'] = []
+        self._failures = 0
+    
+    async def save(self) -> bool:
+        """
+        Write the configuration and wait for the outcome
+        
+        With nothing else pending the write starts at once. Saves that
+        arrive while a write is in flight are held back for the flush
+        interval and then share one disk write; every caller learns
+        whether the write covering its edit succeeded.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self._dirty = True
+        if self._timer is None and self._task is None:
+            self._task = loop.create_task(self._run_flush())
+        return await waiter
+    
+    @property
+    def dirty(self) -> bool:
+        """Whether there are edits not yet handed to a write"""
+        return self._dirty
+    
+    def _arm(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """Start the flush timer unless a flush is already pending or running"""
+        if self._timer is None and self._task is None:
+            self._timer = loop.call_later(delay, self._start_flush)
+    
+    def _start_flush(self) -> None:
+        """Timer callback: run the flush as a task we keep hold of"""
+        self._timer = None
+        self._task = asyncio.get_running_loop().create_task(self._run_flush())
+    
+    async def _run_flush(self) -> None:
+        """Flush, then re-arm if edits arrived meanwhile or the write failed"""
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Unexpected error while flushing config")
+        finally:
+            self._task = None
+        
+        if self._dirty:
+            self._arm(asyncio.get_running_loop(), self._retry_delay())
+    
+    def _retry_delay(self) -> float:
+        """Flush interval, backing off after consecutive failed writes"""
+        return min(self.flush_interval * 2 ** self._failures, self.MAX_RETRY_DELAY)
+    
+    async def flush(self, force: bool = False) -> bool:
+        """Write pending changes (or everything, if forced) without blocking the event loop"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Let a write already in flight finish first, so nothing is left
+        # behind when this returns (e.g. on shutdown)
+        running = self._task
+        if running is not None and running is not asyncio.current_task():
+            await asyncio.shield(running)
+        waiters, self._waiters = self._waiters, []
+        if not (self._dirty or force):
+            # Whatever these callers changed was written by an earlier flush
+            self._resolve(waiters, True)
+            return True
+        self._dirty = False
+        
+        # Serialize on the loop so handlers can't mutate the dict mid-dump,
+        # then hand the disk write to a worker thread
+        try:
+            data = self.config.dumps()
+            saved = await run_config_io(self.config.write_data, data)
+        except Exception as e:
+            logger.error(f"Error saving config: {e}")
+            saved = False
+        
+        if saved:
+            self._failures = 0
+        else:
+            self._failures += 1
+            self._dirty = True
+            # Retry later (a running flush task re-arms once it is done)
+            self._arm(asyncio.get_running_loop(), self._retry_delay())
+        self._resolve(waiters, saved)
+        return saved
+    
+    @staticmethod
+    def _resolve(waiters: List['asyncio.Future[bool]'], saved: bool) -> None:
+        """Tell waiting savers whether the write covering their edit succeeded"""
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(saved)
+
 
 class Config:
     """Configuration loader and storage"""
     
+    # Reads retried when an edit lands mid-reload
+    RELOAD_ATTEMPTS = 3
+    
+    __slots__ = (
+        'config_file', 'config', '_button_index', 'admin_id_set',
+        '_text_cache', 'revision', '_file_stamp', 'writer'
+    )
+    
     def __init__(self, config_file: str = "menu_config.json"):
         self.config_file = config_file
         self.config: Dict[str, Any] = {}
+        self._button_index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self.admin_id_set: FrozenSet[int] = frozenset()
+        self._text_cache: Dict[str, str] = {}
+        # Bumped whenever the configuration is loaded or changed
+        self.revision = 0
+        # (mtime_ns, size) of the file as last loaded or written, or None
+        # when memory and disk may disagree
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        self.writer = ConfigWriter(self)
         self.load_config()
     
     def load_config(self) -> None:
         """Load configuration from JSON file"""
+        self._publish(*self._read_config_file())
+    
+    def _read_config_file(self) -> Tuple[Dict[str, Any], Tuple[int, int]]:
+        """
+        Read, parse and validate the config file without publishing it
+        
+        Touches no shared state, so it can run on the config I/O thread.
+        Returns the parsed data and the file stamp it was read at.
+        """
         if not os.path.exists(self.config_file):
             raise FileNotFoundError(
                 f"Configuration file '{self.config_file}' not found. "
                 "Please create it based on the sample in README.md"
             )
         
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        # Stamp before reading, so a write racing the read forces a re-read
+        stamp = self._stat_file()
+        # Parse the raw bytes; orjson is several times faster than json
+        with open(self.config_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         # Validate required fields
         required_fields = ['bot_token', 'welcome_message', 'menus', 'button_mapping']
         for field in required_fields:
-            if field not in self.config:
+            if field not in data:
                 raise ValueError(f"Missing required field '{field}' in {self.config_file}")
         
         # Validate bot token
-        if self.config['bot_token'] == "YOUR_BOT_TOKEN_HERE":
+        if data['bot_token'] == "YOUR_BOT_TOKEN_HERE":
             raise ValueError(
                 "Please update 'bot_token' in menu_config.json with your actual bot token"
             )
+        
+        self._intern_names(data)
+        return data, stamp
+    
+    def _publish(self, data: Dict[str, Any], stamp: Tuple[int, int]) -> None:
+        """Make freshly read configuration live (on the event loop when one runs)"""
+        # Publish the new configuration with a single reference swap, so
+        # handlers running while a reload is in flight see either the old
+        # dict or the fully validated new one, never a half-loaded mix
+        self.config = data
+        self._button_index.clear()
+        self._bump_revision()
+        self._refresh_admins()
+        self._file_stamp = stamp
+    
+    @staticmethod
+    def _intern_names(data: Dict[str, Any]) -> None:
+        """
+        Intern menu names, button texts and mapping targets in place
+        
+        These few strings recur across menus, the mapping and every user's
+        history; interned, they are stored once and compare by identity.
+        """
+        data['menus'] = {
+            sys.intern(name): menu for name, menu in data['menus'].items()
+        }
+        for menu in data['menus'].values():
+            buttons = menu.get('buttons')
+            if buttons:
+                menu['buttons'] = [
+                    [sys.intern(b) if isinstance(b, str) else b for b in row]
+                    for row in buttons
+                ]
+        data['button_mapping'] = {
+            sys.intern(button): sys.intern(target) if isinstance(target, str) else target
+            for button, target in data['button_mapping'].items()
+        }
+    
+    def _stat_file(self) -> Tuple[int, int]:
+        """Cheap change detector for the config file"""
+        st = os.stat(self.config_file)
+        return st.st_mtime_ns, st.st_size
+    
+    def _refresh_admins(self) -> None:
+        """Rebuild the admin ID snapshot used for permission checks"""
+        self.admin_id_set = frozenset(self.admin_ids)
+    
+    def is_admin(self, user_id: int) -> bool:
+        """Check admin status with a single set lookup"""
+        return user_id in self.admin_id_set
+    
+    def _bump_revision(self) -> None:
+        """Mark the configuration as changed, dropping cached renderings"""
+        self.revision += 1
+        self._text_cache.clear()
+    
+    def _read_if_changed(self) -> Optional[Tuple[Dict[str, Any], Tuple[int, int]]]:
+        """Read the config file, or return None if it is unchanged since the last load or save"""
+        try:
+            unchanged = self._file_stamp is not None and self._stat_file() == self._file_stamp
+        except OSError:
+            unchanged = False
+        if unchanged:
+            logger.info("Configuration file unchanged, skipping reload")
+            return None
+        return self._read_config_file()
     
     def reload_config(self) -> None:
         """Reload configuration from file (useful for runtime updates)"""
-        self.load_config()
+        loaded = self._read_if_changed()
+        if loaded is not None:
+            self._publish(*loaded)
+    
+    async def reload_config_async(self) -> None:
+        """
+        Reload configuration, keeping queued edits
+        
+        The file is read and parsed on the config I/O thread; the swap and
+        cache invalidation happen back on the event loop, where handlers
+        use those caches. An edit made while the file was being read wins
+        over the older data read: the reload starts over, up to
+        RELOAD_ATTEMPTS times, before giving up and keeping the edits.
+        """
+        for _ in range(self.RELOAD_ATTEMPTS):
+            await self.writer.flush()
+            revision = self.revision
+            loaded = await run_config_io(self._read_if_changed)
+            if loaded is None:
+                return
+            if self.revision == revision and not self.writer.dirty:
+                self._publish(*loaded)
+                return
+        logger.warning("Configuration edited during every reload attempt, keeping in-memory edits")
     
     @property
     def bot_token(self) -> str:
         """Get bot token"""
         return self.config['bot_token']
     
+    @property
+    def webhook_url(self) -> Optional[str]:
+        """Public HTTPS base URL for webhook mode (polling is used when unset)"""
+        return self.config.get('webhook_url') or None
+    
+    @property
+    def webhook_listen(self) -> str:
+        """Address the webhook server binds to"""
+        return self.config.get('webhook_listen', '0.0.0.0')
+    
+    @property
+    def webhook_port(self) -> int:
+        """Port the webhook server listens on"""
+        return int(self.config.get('webhook_port', 8443))
+    
+    @property
+    def webhook_secret(self) -> Optional[str]:
+        """Secret token Telegram sends with every webhook request, if set"""
+        return self.config.get('webhook_secret') or None
+    
+    @property
+    def redis_url(self) -> Optional[str]:
+        """Redis URL for shared navigation history (kept in memory when unset)"""
+        return self.config.get('redis_url') or None
+    
     @property
     def welcome_message(self) -> str:
         """Get welcome message"""
@@ -75,82 +368,224 @@ class Config:
         """Get list of admin user IDs"""
         return self.config.get('admin_ids', [])
     
+    @property
+    def admin_list_text(self) -> str:
+        """Admin IDs rendered as an HTML bullet list (cached until config changes)"""
+        text = self._text_cache.get('admin_list')
+        if text is None:
+            text = self._text_cache['admin_list'] = "\n".join(
+                [f"  • <code>{aid}</code>" for aid in self.admin_ids]
+            )
+        return text
+    
+    @property
+    def admin_inline_text(self) -> str:
+        """Admin IDs rendered as a comma-separated HTML list (cached)"""
+        text = self._text_cache.get('admin_inline')
+        if text is None:
+            text = self._text_cache['admin_inline'] = ', '.join(
+                [f"<code>{aid}</code>" for aid in self.admin_ids]
+            )
+        return text
+    
+    @property
+    def response_keys_text(self) -> str:
+        """Buttons with custom responses rendered as a bullet list (cached)"""
+        text = self._text_cache.get('response_keys')
+        if text is None:
+            text = self._text_cache['response_keys'] = "\n".join(
+                [f"  • {escape(k)}" for k in self.responses]
+            )
+        return text
+    
+    @property
+    def menu_keys_text(self) -> str:
+        """Menu names rendered as an HTML bullet list (cached)"""
+        text = self._text_cache.get('menu_keys')
+        if text is None:
+            text = self._text_cache['menu_keys'] = "\n".join(
+                [f"  • <code>{escape(k)}</code>" for k in self.menus]
+            )
+        return text
+    
+    @property
+    def menu_inline_text(self) -> str:
+        """Menu names rendered as a comma-separated HTML list (cached)"""
+        text = self._text_cache.get('menu_inline')
+        if text is None:
+            text = self._text_cache['menu_inline'] = ", ".join(
+                [f"<code>{escape(m)}</code>" for m in self.menus]
+            )
+        return text
+    
+    @property
+    def deletable_menus_text(self) -> str:
+        """Non-reserved menu names rendered as an HTML bullet list (cached)"""
+        text = self._text_cache.get('deletable_menus')
+        if text is None:
+            text = self._text_cache['deletable_menus'] = "\n".join(
+                [f"• <code>{escape(m)}</code>" for m in self.menus if m not in RESERVED_MENUS]
+            )
+        return text
+    
     def get_menu(self, menu_name: str) -> Dict[str, Any]:
         """Get specific menu by name"""
         return self.menus.get(menu_name, {})
     
-    def save_config(self) -> bool:
-        """Save current configuration back to JSON file"""
+    def button_index(self, menu_name: str) -> Dict[str, Tuple[int, int]]:
+        """Get {button_text: (row, col)} for a menu, built on first use"""
+        index = self._button_index.get(menu_name)
+        if index is None:
+            index = {}
+            for row_idx, row in enumerate(self.get_menu(menu_name).get('buttons', [])):
+                for col_idx, button in enumerate(row):
+                    index.setdefault(button, (row_idx, col_idx))
+            self._button_index[menu_name] = index
+        return index
+    
+    def find_button(self, menu_name: str, button_text: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the (row, col) of the first button with this text in a menu
+        
+        Uses the button index, and falls back to a direct scan if the
+        indexed slot no longer holds that button (the menu was changed
+        without invalidating the index).
+        """
+        buttons = self.get_menu(menu_name).get('buttons', [])
+        position = self.button_index(menu_name).get(button_text)
+        if position is not None:
+            row_idx, col_idx = position
+            if (row_idx < len(buttons) and col_idx < len(buttons[row_idx])
+                    and buttons[row_idx][col_idx] == button_text):
+                return position
+        
+        position = next(
+            ((row_idx, col_idx)
+             for row_idx, row in enumerate(buttons)
+             for col_idx, button in enumerate(row)
+             if button == button_text),
+            None
+        )
+        if position is not None:
+            logger.warning(f"Stale button index for menu '{menu_name}', rebuilding")
+            self.invalidate_button_index(menu_name)
+        return position
+    
+    def invalidate_button_index(self, menu_name: str) -> None:
+        """Drop the cached button index after a menu's buttons change"""
+        self._button_index.pop(menu_name, None)
+    
+    def dumps(self) -> bytes:
+        """Serialize current configuration to UTF-8 JSON (with orjson when installed)"""
+        if orjson is not None:
+            return orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+        return json.dumps(self.config, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    def write_data(self, data: bytes) -> bool:
+        """
+        Write serialized configuration to the JSON file
+        
+        The data goes to a temporary file next to the config, which then
+        replaces it, so a crash mid-write never leaves a truncated file.
+        """
+        tmp_file = f"{self.config_file}.tmp"
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                # Make sure the bytes are on disk before the rename is
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            self._file_stamp = self._stat_file()
             logger.info("Configuration saved successfully")
             return True
+        except Exception as e:
+            logger.error(f"Error saving config: {e}")
+            self._file_stamp = None
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return False
+    
+    def save_config(self) -> bool:
+        """Save current configuration back to JSON file"""
+        self._bump_revision()
+        try:
+            data = self.dumps()
         except Exception as e:
             logger.error(f"Error saving config: {e}")
             return False
+        return self.write_data(data)
+    
+    async def save_config_async(self) -> bool:
+        """Save configuration on the config I/O thread and report whether it was written"""
+        self._bump_revision()
+        return await self.writer.save()
     
-    def update_welcome_message(self, message: str) -> bool:
+    async def update_welcome_message(self, message: str) -> bool:
         """Update welcome message"""
         self.config['welcome_message'] = message
-        if self.save_config():
+        if await self.save_config_async():
             logger.info(f"Welcome message updated: {message[:50]}...")
             return True
         return False
     
-    def add_admin(self, user_id: int) -> bool:
+    async def add_admin(self, user_id: int) -> bool:
         """Add admin user ID"""
-        if user_id not in self.config['admin_ids']:
+        if not self.is_admin(user_id):
             self.config['admin_ids'].append(user_id)
-            return self.save_config()
+            self._refresh_admins()
+            return await self.save_config_async()
         return False
     
-    def remove_admin(self, user_id: int) -> bool:
+    async def remove_admin(self, user_id: int) -> bool:
         """Remove admin user ID"""
-        if user_id in self.config['admin_ids']:
+        if self.is_admin(user_id):
             self.config['admin_ids'].remove(user_id)
-            return self.save_config()
+            self._refresh_admins()
+            return await self.save_config_async()
         return False
     
-    def update_response(self, button_text: str, response: str) -> bool:
+    async def update_response(self, button_text: str, response: str) -> bool:
         """Update or add a button response"""
         if 'responses' not in self.config:
             self.config['responses'] = {}
         self.config['responses'][button_text] = response
-        if self.save_config():
+        if await self.save_config_async():
             logger.info(f"Response updated for button: {button_text}")
             return True
         return False
     
-    def delete_response(self, button_text: str) -> bool:
+    async def delete_response(self, button_text: str) -> bool:
         """Delete a button response"""
         if button_text in self.config.get('responses', {}):
             del self.config['responses'][button_text]
-            return self.save_config()
+            return await self.save_config_async()
         return False
     
-    def add_menu(self, menu_name: str, menu_title: str) -> bool:
+    async def add_menu(self, menu_name: str, menu_title: str) -> bool:
         """Add a new menu"""
         if menu_name in self.config['menus']:
             return False  # Menu already exists
         
         # Create new menu with basic structure
+        self.invalidate_button_index(menu_name)
         self.config['menus'][menu_name] = {
             "title": menu_title,
             "buttons": [
                 ["⬅ Back", "🔝 Main Menu"]
             ]
         }
-        return self.save_config()
+        return await self.save_config_async()
     
-    def delete_menu(self, menu_name: str) -> bool:
+    async def delete_menu(self, menu_name: str) -> bool:
         """Delete a menu"""
         # Don't allow deleting essential menus
-        if menu_name in ['main', 'admin']:
+        if menu_name in RESERVED_MENUS:
             return False
         
         if menu_name in self.config['menus']:
             del self.config['menus'][menu_name]
+            self.invalidate_button_index(menu_name)
             
             # Clean up button mappings that point to this menu
             mappings_to_remove = []
@@ -161,7 +596,7 @@ class Config:
             for button in mappings_to_remove:
                 del self.config['button_mapping'][button]
             
-            return self.save_config()
+            return await self.save_config_async()
         return False
 
 